@@ -25,7 +25,7 @@ from pyspex.ogse_db import (read_ref_diode, read_wav_mon,
                             add_ogse_ref_diode, add_ogse_wav_mon)
 from pyspex.ogse_dolp import gsfc_polarizer
 from pyspex.ogse_helios import helios_spectrum
-from pyspex.ogse_grande import grande_spectrum
+from pyspex.ogse_grande import add_ogse_grande
 from pyspex.ogse_laser import read_gse_excel
 
 # - global parameters ------------------------------
@@ -77,9 +77,7 @@ def write_ogse(args):
                       group='/gse_data/SpectralDolP')
         for n_lamps in (1, 2, 3, 5, 9):
             if args.l1a_file.name.find(f'-L{n_lamps:1d}_') > 0:
-                xds = grande_spectrum(n_lamps)
-                xds.to_netcdf(args.l1a_file, mode='r+', format='NETCDF4',
-                              group='/gse_data/ReferenceSpectrum')
+                add_ogse_grande(args.l1a_file, n_lamps)
                 break
 
     if args.opo_laser:
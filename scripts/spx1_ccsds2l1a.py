@@ -170,22 +170,31 @@ def main():
         return
 
     # extract timestaps, telemetry and image data from Science data
-    img_sec = np.empty(len(science_tm), dtype='u4')
-    img_subsec = np.empty(len(science_tm), dtype='u2')
-    img_id = np.empty(len(science_tm), dtype='u4')
+    img_hdr = np.empty(len(science_tm),
+                       dtype=science_tm[0].dtype['packet_header'])
+    img_icu = np.empty(len(science_tm), dtype=science_tm[0].dtype['icu_time'])
     img_hk = np.empty(len(science_tm), dtype=tmtc_dtype(0x350))
-    img_data = []
+    # images are copied into a 2-D array, unless their sizes differ
+    img_sizes = {packet['image_data'].size for packet in science_tm}
+    if len(img_sizes) == 1:
+        img_data = np.empty((len(science_tm), img_sizes.pop()),
+                            dtype=science_tm[0]['image_data'].dtype)
+    else:
+        img_data = np.empty(len(science_tm), dtype='O')
     for ii, packet in enumerate(science_tm):
-        if packet['science_hk']['ICUSWVER'] > 0x123:
-            img_sec[ii] = packet['icu_time']['tai_sec']
-            img_subsec[ii] = packet['icu_time']['sub_sec']
-        else:
-            img_sec[ii] = packet['packet_header']['tai_sec']
-            img_subsec[ii] = packet['packet_header']['sub_sec']
-        img_id[ii] = packet['packet_header']['sequence'] & 0x3fff
+        img_hdr[ii] = packet['packet_header']
+        img_icu[ii] = packet['icu_time']
         img_hk[ii] = packet['science_hk']
-        img_data.append(packet['image_data'])
-    img_data = np.array(img_data)
+        img_data[ii] = packet['image_data']
+
+    # the ICU time is only valid for ICU S/W versions after 0x123,
+    # else use the time of the packet header
+    icu_time_valid = img_hk['ICUSWVER'] > 0x123
+    img_sec = np.where(icu_time_valid,
+                       img_icu['tai_sec'], img_hdr['tai_sec']).astype('u4')
+    img_subsec = np.where(icu_time_valid,
+                          img_icu['sub_sec'], img_hdr['sub_sec']).astype('u2')
+    img_id = (img_hdr['sequence'] & 0x3fff).astype('u4')
 
     if np.all(img_hk['ICUSWVER'] == 0x123):
         # fix bug in sub-seconds
@@ -198,12 +207,14 @@ def main():
 
     # extract timestaps and telemetry of NomHK data
     if nomhk_tm:
-        nomhk_sec = np.empty(len(nomhk_tm), dtype='u4')
-        nomhk_subsec = np.empty(len(nomhk_tm), dtype='u2')
+        nomhk_sec = np.fromiter(
+            (packet['packet_header']['tai_sec'] for packet in nomhk_tm),
+            dtype='u4', count=len(nomhk_tm))
+        nomhk_subsec = np.fromiter(
+            (packet['packet_header']['sub_sec'] for packet in nomhk_tm),
+            dtype='u2', count=len(nomhk_tm))
         nomhk_data = np.empty(len(nomhk_tm), dtype=tmtc_dtype(0x320))
         for ii, packet in enumerate(nomhk_tm):
-            nomhk_sec[ii] = packet['packet_header']['tai_sec']
-            nomhk_subsec[ii] = packet['packet_header']['sub_sec']
             nomhk_data[ii] = packet['nominal_hk']
 
         if np.all(img_hk['ICUSWVER'] == 0x123):
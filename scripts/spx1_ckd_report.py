@@ -13,15 +13,44 @@ Python script to generate a report from the CKD in a CKD product.
 """
 import argparse
 
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+import xarray as xr
+
 from moniplot.lib.fig_info import FIGinfo
 from moniplot.mon_plot import MONplot
 
 from pyspex.ckd_io import CKDio
 
 # - global parameters ------------------------------
+# buffers for the differences with the reference CKD, key: (shape, dtype)
+DIFF_BUFFERS = {}
 
 
 # - local functions --------------------------------
+def ckd_diff(ckd_xarr, ckd_ref, ds_name=None,
+             source_sel=None) -> xr.DataArray:
+    """
+    Return difference between a CKD parameter and its reference
+
+    The reference is either a CKD parameter already in memory (xr.DataArray)
+    or it is read from CKDio 'ckd_ref' directly into a buffer. This buffer is
+    re-used for all CKD parameters with the same shape and data type, and the
+    difference is calculated in-place.
+    """
+    key = (ckd_xarr.shape, ckd_xarr.dtype)
+    if key not in DIFF_BUFFERS:
+        DIFF_BUFFERS[key] = np.empty(key[0], dtype=key[1])
+    buff = DIFF_BUFFERS[key]
+    if isinstance(ckd_ref, xr.DataArray):
+        np.subtract(ckd_xarr.values, ckd_ref.values, out=buff)
+    else:
+        ckd_ref.read_direct(ds_name, buff, source_sel=source_sel)
+        np.subtract(ckd_xarr.values, buff, out=buff)
+    return xr.DataArray(buff, coords=ckd_xarr.coords, dims=ckd_xarr.dims)
+
+
 def init_plot_file(key: str, ckd, ckd_ref=None):
     """
     Initialize CKD report
@@ -76,36 +105,41 @@ def add_dark_figs(ckd, ckd_ref=None):
     plot.draw_hist(dark_ckd['dark_current'], bins=101, vrange=[1.5, 6.5],
                    title='dark current', fig_info=fig_info_in.copy())
 
-    ref_ckd = ckd_ref.dark() if ckd_ref is not None else None
-    if ref_ckd is None:
+    if ckd_ref is None or 'DARK' not in ckd_ref:
         plot.close()
         return
 
-    ref_version = 'v1' if 'dark_offset' in ref_ckd.data_vars else 'v2'
+    ref_version = 'v1' if 'DARK/dark_offset' in ckd_ref else 'v2'
 
     if ckd_version == 'v1':
         if ref_version == 'v1':
-            plot.draw_signal(dark_ckd['dark_offset'] - ref_ckd['dark_offset'],
+            plot.draw_signal(ckd_diff(dark_ckd['dark_offset'],
+                                      ckd_ref, 'DARK/dark_offset'),
                              title='dark offset - reference',
                              fig_info=fig_info_in.copy(), zscale='diff')
         else:
-            plot.draw_signal(dark_ckd['dark_offset'] - ref_ckd['offset_long'],
+            plot.draw_signal(ckd_diff(dark_ckd['dark_offset'],
+                                      ckd_ref, 'DARK/offset_long'),
                              title='dark offset - reference',
                              fig_info=fig_info_in.copy(), zscale='diff')
     else:
         if ref_version == 'v1':
-            plot.draw_signal(dark_ckd['offset_long'] - ref_ckd['dark_offset'],
+            plot.draw_signal(ckd_diff(dark_ckd['offset_long'],
+                                      ckd_ref, 'DARK/dark_offset'),
                              title='offset (long) - reference',
                              fig_info=fig_info_in.copy(), zscale='diff')
         else:
-            plot.draw_signal(dark_ckd['offset_short'] - ref_ckd['offset_short'],
+            plot.draw_signal(ckd_diff(dark_ckd['offset_short'],
+                                      ckd_ref, 'DARK/offset_short'),
                              title='offset (short) - reference',
                              fig_info=fig_info_in.copy(), zscale='diff')
-            plot.draw_signal(dark_ckd['offset_long'] - ref_ckd['offset_long'],
+            plot.draw_signal(ckd_diff(dark_ckd['offset_long'],
+                                      ckd_ref, 'DARK/offset_long'),
                              title='offset (long) - reference',
                              fig_info=fig_info_in.copy(), zscale='diff')
 
-    plot.draw_signal(dark_ckd['dark_current'] - ref_ckd['dark_current'],
+    plot.draw_signal(ckd_diff(dark_ckd['dark_current'],
+                              ckd_ref, 'DARK/dark_current'),
                      title='dark current - reference',
                      fig_info=fig_info_in.copy(), zscale='diff')
     plot.close()
@@ -131,12 +165,11 @@ def add_noise_figs(ckd, ckd_ref=None):
     plot.draw_hist(noise_ckd['n'], bins=161, vrange=[0, 8],
                    title=n_str, fig_info=fig_info_in.copy())
 
-    ref_ckd = ckd_ref.noise() if ckd_ref is not None else None
-    if ref_ckd is not None:
-        plot.draw_signal(noise_ckd['g'] - ref_ckd['g'],
+    if ckd_ref is not None and 'NOISE' in ckd_ref:
+        plot.draw_signal(ckd_diff(noise_ckd['g'], ckd_ref, 'NOISE/g'),
                          title=g_str + ' - reference',
                          fig_info=fig_info_in.copy(), zscale='diff')
-        plot.draw_signal(noise_ckd['n'] - ref_ckd['n'],
+        plot.draw_signal(ckd_diff(noise_ckd['n'], ckd_ref, 'NOISE/n'),
                          title=n_str + ' - reference',
                          fig_info=fig_info_in.copy(), zscale='diff')
     plot.close()
@@ -184,7 +217,7 @@ def add_prnu_figs(ckd, ckd_ref=None):
         plot.draw_hist(ref_ckd, bins=201, vrange=[0.95, 1.05],
                        title=prnu_str, fig_info=fig_info_in.copy())
         prnu_str = 'Pixel Response Non-Uniformity'
-        plot.draw_signal(prnu_ckd - ref_ckd,
+        plot.draw_signal(ckd_diff(prnu_ckd, ref_ckd),
                          title=prnu_str + ' - reference',
                          fig_info=fig_info_in.copy(), zscale='diff')
     plot.close()
@@ -241,15 +274,19 @@ def add_wave_figs(ckd, ckd_ref=None):
     plot.draw_signal(wave_ckd['wave_common'], fig_info=fig_info_in.copy(),
                      title=wave_str)
 
-    ref_ckd = ckd_ref.wavelength() if ckd_ref is not None else None
-    if ref_ckd is not None:
-        plot.draw_signal(wave_ckd['wave_common'] - ref_ckd['wave_common'],
+    if ckd_ref is not None and 'WAVELENGTH' in ckd_ref:
+        plot.draw_signal(ckd_diff(wave_ckd['wave_common'], ckd_ref,
+                                  'WAVELENGTH/wave_common'),
                          title=wave_str + ' - reference',
                          fig_info=fig_info_in.copy(), zscale='diff')
-        plot.draw_signal(wave_ckd['wave_full'][0, ...] - ref_ckd['wave_full'][0, ...],
+        plot.draw_signal(ckd_diff(wave_ckd['wave_full'][0, ...], ckd_ref,
+                                  'WAVELENGTH/wave_full',
+                                  source_sel=np.s_[0, ...]),
                          title=wave_s_str + ' - reference',
                          fig_info=fig_info_in.copy(), zscale='diff')
-        plot.draw_signal(wave_ckd['wave_full'][1, ...] - ref_ckd['wave_full'][1, ...],
+        plot.draw_signal(ckd_diff(wave_ckd['wave_full'][1, ...], ckd_ref,
+                                  'WAVELENGTH/wave_full',
+                                  source_sel=np.s_[1, ...]),
                          title=wave_p_str + ' - reference',
                          fig_info=fig_info_in.copy(), zscale='diff')
     plot.close()
@@ -271,12 +308,15 @@ def add_rad_figs(ckd, ckd_ref=None):
     plot.draw_signal(rad_ckd[:, 1, :], fig_info=fig_info_in.copy(),
                      title=rad_p_str)
 
-    ref_ckd = ckd_ref.radiometric() if ckd_ref is not None else None
-    if ref_ckd is not None:
-        plot.draw_signal(rad_ckd[:, 0, :] - ref_ckd[:, 0, :],
+    if ckd_ref is not None and 'RADIOMETRIC' in ckd_ref:
+        plot.draw_signal(ckd_diff(rad_ckd[:, 0, :], ckd_ref,
+                                  'RADIOMETRIC/rad_spectra',
+                                  source_sel=np.s_[:, 0, :]),
                          title=rad_s_str + ' - reference',
                          fig_info=fig_info_in.copy(), zscale='diff')
-        plot.draw_signal(rad_ckd[:, 1, :] - ref_ckd[:, 1, :],
+        plot.draw_signal(ckd_diff(rad_ckd[:, 1, :], ckd_ref,
+                                  'RADIOMETRIC/rad_spectra',
+                                  source_sel=np.s_[:, 1, :]),
                          title=rad_p_str + ' - reference',
                          fig_info=fig_info_in.copy(), zscale='diff')
     plot.close()
@@ -301,20 +341,37 @@ def add_pol_figs(ckd, ckd_ref=None):
     plot.draw_signal(pol_ckd['pol_m_t'], fig_info=fig_info_in.copy(),
                      title=pol_t_str)
 
-    ref_ckd = ckd_ref.polarimetric() if ckd_ref is not None else None
-    if ref_ckd is not None:
-        plot.draw_signal(pol_ckd['pol_m_q'] - ref_ckd['pol_m_q'],
+    if ckd_ref is not None and 'POLARIMETRIC' in ckd_ref:
+        plot.draw_signal(ckd_diff(pol_ckd['pol_m_q'], ckd_ref,
+                                  'POLARIMETRIC/pol_m_q'),
                          title=pol_q_str + ' - reference',
                          fig_info=fig_info_in.copy(), zscale='diff')
-        plot.draw_signal(pol_ckd['pol_m_u'] - ref_ckd['pol_m_u'],
+        plot.draw_signal(ckd_diff(pol_ckd['pol_m_u'], ckd_ref,
+                                  'POLARIMETRIC/pol_m_u'),
                          title=pol_u_str + ' - reference',
                          fig_info=fig_info_in.copy(), zscale='diff')
-        plot.draw_signal(pol_ckd['pol_m_t'] - ref_ckd['pol_m_t'],
+        plot.draw_signal(ckd_diff(pol_ckd['pol_m_t'], ckd_ref,
+                                  'POLARIMETRIC/pol_m_t'),
                          title=pol_t_str + ' - reference',
                          fig_info=fig_info_in.copy(), zscale='diff')
     plot.close()
 
 
+def create_report(add_figs, ckd_file: str, ref_ckd_file=None) -> None:
+    """
+    Open the CKD products and generate the figures of one CKD
+
+    Called in a worker process, therefore, the CKD products are opened here
+    """
+    with CKDio(ckd_file) as ckd:
+        if ref_ckd_file is None:
+            add_figs(ckd)
+            return
+
+        with CKDio(ref_ckd_file) as ckd_ref:
+            add_figs(ckd, ckd_ref)
+
+
 # - main function ----------------------------------
 def main() -> None:
     """
@@ -330,24 +387,14 @@ def main() -> None:
     parser.add_argument('ckd_file', help='name of CKD product')
     args = parser.parse_args()
 
-    # open CKD product
-    ckd = CKDio(args.ckd_file)
-
-    # open CKD product to be used as reference
-    ckd_ref = None
-    if args.ref_ckd_file is not None:
-        ckd_ref = CKDio(args.ref_ckd_file)
-
-    # add CKD's to report
-    add_dark_figs(ckd, ckd_ref)
-    add_noise_figs(ckd, ckd_ref)
-    # add_nlin_figs(ckd, ckd_ref)
-    add_prnu_figs(ckd, ckd_ref)
-    # add_fov_figs(ckd, ckd_ref)
-    # add_swath_figs(ckd, ckd_ref)
-    add_wave_figs(ckd, ckd_ref)
-    add_rad_figs(ckd, ckd_ref)
-    add_pol_figs(ckd, ckd_ref)
+    # add CKD's to report, each CKD is written to its own PDF file
+    add_figs = (add_dark_figs, add_noise_figs, add_prnu_figs,
+                add_wave_figs, add_rad_figs, add_pol_figs)
+    # add_nlin_figs, add_fov_figs and add_swath_figs are not yet implemented
+    with Pool(min(len(add_figs), cpu_count())) as pool:
+        pool.starmap(create_report,
+                     [(func, args.ckd_file, args.ref_ckd_file)
+                      for func in add_figs])
 
 
 # --------------------------------------------------
@@ -16,18 +16,115 @@ References
 """
 __all__ = ['CKDio']
 
-from datetime import datetime, timezone
-from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from pathlib import Path, PurePath
+import re
 
 import h5py
+import numpy as np
 import xarray as xr
 
-from moniplot.image_to_xarray import h5_to_xr
+# - global parameters ------------------------------
+# fill value of floating-point CKD parameters
+FILLVALUE = float.fromhex('0x1.ep+122')
 
+# size and number of slots of the HDF5 chunk cache (number of slots is prime)
+RDCC_NBYTES = 64 * 1024 ** 2
+RDCC_NSLOTS = 10007
+
+# identifier of the HDF5 filter bitshuffle
+BSHUF_FILTER = 32008
+
+# creation date as written by spexone_cal, e.g.
+#     "2022 September 16 Fri UTC+0000 17:46:32"
+DATE_RE = re.compile(r'(?P<year>\d{4}) (?P<month>[A-Za-z]+) (?P<day>\d{1,2})'
+                     r' [A-Za-z]+ [A-Za-z]*(?P<tz>[+-]\d{4})'
+                     r' (?P<hour>\d{2}):(?P<minute>\d{2}):(?P<second>\d{2})')
+MONTHS = ('January', 'February', 'March', 'April', 'May', 'June', 'July',
+          'August', 'September', 'October', 'November', 'December')
+
+# attributes of a HDF5 dataset which are not copied to xarray
+H5_SKIP_ATTRS = ('CLASS', 'DIMENSION_LIST', 'NAME', 'REFERENCE_LIST',
+                 '_Netcdf4Dimid', '_Netcdf4Coordinates')
 
-# - global parameters ------------------------------
 
 # - local functions --------------------------------
+def h5_attrs(dset: h5py.Dataset) -> dict:
+    """Return attributes of a HDF5 dataset, without the netCDF4 internals.
+    """
+    attrs = {}
+    for key, value in dset.attrs.items():
+        if key in H5_SKIP_ATTRS:
+            continue
+        if isinstance(value, np.ndarray) and len(value) == 1:
+            value = value[0]
+        attrs[key] = value.decode('ascii') if isinstance(value, bytes) \
+            else value
+    return attrs
+
+
+def parse_date(date_str: str) -> datetime:
+    """Return date of an ISO 8601 string or a string as written by spexone_cal.
+
+    Notes
+    -----
+    The format of spexone_cal is "%Y %B %d %a %Z%z %H:%M:%S", which is parsed
+    without the locale dependent strptime
+    """
+    try:
+        return datetime.fromisoformat(date_str)
+    except ValueError:
+        pass
+
+    res = DATE_RE.fullmatch(date_str)
+    if res is None or res['month'] not in MONTHS:
+        return datetime.strptime(date_str, "%Y %B %d %a %Z%z %H:%M:%S")
+
+    tz_offs = timedelta(hours=int(res['tz'][1:3]), minutes=int(res['tz'][3:]))
+    if res['tz'][0] == '-':
+        tz_offs = -tz_offs
+    return datetime(int(res['year']), MONTHS.index(res['month']) + 1,
+                    int(res['day']), int(res['hour']), int(res['minute']),
+                    int(res['second']), tzinfo=timezone(tz_offs))
+
+
+def mem_dtype(dset: h5py.Dataset) -> np.dtype:
+    """Return data type of a CKD parameter in memory, floats are doubles.
+    """
+    return np.dtype(float) if np.issubdtype(dset.dtype, np.floating) \
+        else dset.dtype
+
+
+def arange_coord(size: int) -> np.ndarray:
+    """Return evenly spaced coordinates of a dimension, as in h5_to_xr.
+    """
+    return np.arange(size, dtype='u2' if ((size - 1) >> 16) == 0 else 'u4')
+
+
+def to_dataset(res: list) -> xr.Dataset:
+    """Combine CKD parameters of one group into a xarray.Dataset.
+
+    Notes
+    -----
+    The parameters of a CKD group share their dimensions, therefore, no
+    alignment is needed. Attributes of the parameters are combined,
+    attributes with conflicting values are dropped.
+    """
+    attrs = {}
+    conflicts = set()
+    for xarr in res:
+        for key, value in xarr.attrs.items():
+            if key in conflicts:
+                continue
+            if key in attrs and not np.array_equal(attrs[key], value):
+                conflicts.add(key)
+                del attrs[key]
+            else:
+                attrs[key] = value
+
+    return xr.Dataset(data_vars={xarr.name: xarr for xarr in res},
+                      attrs=attrs)
+
 
 # - class CKDio -------------------------
 class CKDio:
@@ -37,9 +134,23 @@ class CKDio:
     ----------
     ckd_file :  str
         Name of CKD file
+    in_memory :  bool, default=False
+        Read the whole CKD product into memory (HDF5 core driver), which is
+        efficient when most CKD parameters are read
+    rdcc_nbytes :  int, default=64 MiB
+        Size of the HDF5 chunk cache per dataset
+    reuse_buffers :  bool, default=False
+        Read CKD parameters into the same arrays at repeated calls of a
+        reader, thus the data of earlier returned objects is overwritten
     verbose :  bool, default=False
         Be verbose
 
+    Notes
+    -----
+    CKD parameters which are chunked per detector area and compressed with
+    bitshuffle+LZ4 are smaller and faster to read than uncompressed
+    parameters. Reading them requires the HDF5 plugins of hdf5plugin.
+
     Examples
     --------
     Read several CKD parameters:
@@ -49,15 +160,41 @@ class CKDio:
     >>>    fov = ckd.fov()
 
     """
-    def __init__(self, ckd_file: Path, verbose=False) -> None:
+    __slots__ = ('verbose', 'fid', '__groups', '__dsets', '__scales',
+                 '__buffers', '__attrs', '__date_created')
+
+    def __init__(self, ckd_file: Path, in_memory=False,
+                 rdcc_nbytes=RDCC_NBYTES, reuse_buffers=False,
+                 verbose=False) -> None:
         """Initialize class attributes.
         """
         self.verbose = verbose
 
-        # open access to CKD product
-        self.fid = h5py.File(ckd_file, "r")
+        # open access to CKD product, the chunk cache is large enough to hold
+        # the largest CKD parameters
+        if in_memory:
+            self.fid = h5py.File(ckd_file, "r", driver='core',
+                                 backing_store=False, rdcc_nbytes=rdcc_nbytes,
+                                 rdcc_nslots=RDCC_NSLOTS)
+        else:
+            self.fid = h5py.File(ckd_file, "r", rdcc_nbytes=rdcc_nbytes,
+                                 rdcc_nslots=RDCC_NSLOTS)
         if 'processor_configuration' not in self.fid:
             raise RuntimeError('SPEXone CKD product corrupted?')
+        if self.verbose and not h5py.h5z.filter_avail(BSHUF_FILTER):
+            print('[WARNING]: HDF5 filter bitshuffle is not available,'
+                  ' install hdf5plugin to read bitshuffle compressed CKD')
+        # names of the groups in the product, one group per CKD
+        self.__groups = set(self.fid)
+        # HDF5 datasets of CKD parameters which are already accessed
+        self.__dsets = {}
+        # coordinates of the dimension scales which are already read
+        self.__scales = {}
+        # arrays of CKD parameters which are re-used, or None
+        self.__buffers = {} if reuse_buffers else None
+        # global attributes, which are decoded only once
+        self.__attrs = {}
+        self.__date_created = None
 
     def __enter__(self):
         """Method called to initiate the context manager.
@@ -76,12 +213,26 @@ class CKDio:
         if self.fid is not None:
             self.fid.close()
 
+    def __contains__(self, name: str) -> bool:
+        """Return True if group or dataset 'name' is present in the product.
+        """
+        return name in self.fid
+
+    def __attr(self, name: str) -> str:
+        """Return (cached) value of a global string attribute.
+        """
+        if name not in self.__attrs:
+            # variable-length strings are already returned as str by h5py
+            value = self.fid.attrs[name]
+            self.__attrs[name] = value.decode() \
+                if isinstance(value, bytes) else value
+        return self.__attrs[name]
+
     @property
     def processor_version(self) -> str:
         """Return the version of the spexone_cal program.
         """
-        # pylint: disable=no-member
-        return self.fid.attrs['processor_version'].decode()
+        return self.__attr('processor_version')
 
     def date_created(self, compact=False) -> str:
         """Return creation date of the CKD product.
@@ -91,20 +242,138 @@ class CKDio:
         compact :  bool
            return date in isoformat if not compact else return 'YYYYmmddHHMMSS'
         """
-        # pylint: disable=no-member
-        date_str = self.fid.attrs['date_created'].decode()
-        date_t = datetime.strptime(date_str, "%Y %B %d %a %Z%z %H:%M:%S")
+        if self.__date_created is None:
+            self.__date_created = parse_date(
+                self.__attr('date_created')).astimezone(tz=timezone.utc)
+
         if compact:
-            return date_t.astimezone(tz=timezone.utc).strftime("%Y%m%d%H%M%S")
+            return self.__date_created.strftime("%Y%m%d%H%M%S")
 
-        return date_t.astimezone(tz=timezone.utc).isoformat()[:-6]
+        return self.__date_created.isoformat()[:-6]
 
     @property
     def git_commit(self) -> str:
         """Return git hash of repository spexone_cal, used to generate the CKD.
         """
-        # pylint: disable=no-member
-        return self.fid.attrs['git_commit'].decode()
+        return self.__attr('git_commit')
+
+    def read_direct(self, ds_name: str, out: np.ndarray,
+                    source_sel=None) -> None:
+        """Read a CKD parameter directly into an existing array.
+
+        Parameters
+        ----------
+        ds_name :  str
+           name of the CKD parameter, e.g. 'DARK/dark_current'
+        out :  np.ndarray
+           C-contiguous array with the same number of elements as selected
+        source_sel :  tuple of slices, optional
+           selection of the CKD parameter, default is to read all data
+
+        Notes
+        -----
+        Fill values of floating-point parameters are replaced by NaN
+        """
+        dset = self.__dset(ds_name)
+        if source_sel is None:
+            # low-level read of the whole dataset, skips the selection logic
+            dset.id.read(h5py.h5s.ALL, h5py.h5s.ALL, out)
+        else:
+            dset.read_direct(out, source_sel=source_sel)
+        if np.issubdtype(out.dtype, np.floating):
+            out[out == FILLVALUE] = np.nan
+
+    def __dset(self, ds_name: str) -> h5py.Dataset:
+        """Return HDF5 dataset of a CKD parameter, the object is cached.
+        """
+        if ds_name not in self.__dsets:
+            self.__dsets[ds_name] = self.fid[ds_name]
+        return self.__dsets[ds_name]
+
+    def __coords(self, dset: h5py.Dataset) -> tuple:
+        """Return dimensions and coordinates of a CKD parameter.
+
+        Notes
+        -----
+        Follows the rules of moniplot.image_to_xarray.h5_to_xr:
+
+        * dimension scales with only zero's (netCDF4 dimensions without a
+          variable) are not used as coordinates, except for 'row' and
+          'column' which get evenly spaced coordinates
+        * datasets without dimension scales get the dimensions
+          ('time', 'row', 'column') with evenly spaced coordinates
+
+        The coordinates of a dimension scale are read only once.
+        """
+        dims = []
+        coords = {}
+        try:
+            for ii, dim in enumerate(dset.dims):
+                scale = dim[0]
+                name = PurePath(scale.name).name
+                if name.startswith('row') or name.startswith('column'):
+                    name = name.split(' ')[0]
+
+                if scale.name not in self.__scales:
+                    buff = scale[()] if scale.size > 0 else None
+                    if buff is None or np.all(buff == 0):
+                        buff = (arange_coord(dset.shape[ii])
+                                if name in ('row', 'column') else None)
+                    self.__scales[scale.name] = buff
+
+                dims.append(name)
+                if self.__scales[scale.name] is not None:
+                    coords[name] = self.__scales[scale.name]
+        except RuntimeError:
+            if dset.ndim > 3:
+                raise ValueError('not implemented for ndim > 3') from None
+            dims = ['time', 'row', 'column'][3 - dset.ndim:]
+            coords = {name: arange_coord(size)
+                      for name, size in zip(dims, dset.shape)}
+        return dims, coords
+
+    def __buffer(self, key, shape: tuple, dtype) -> np.ndarray:
+        """Return array to read CKD parameters into, re-used when requested.
+        """
+        if self.__buffers is None:
+            return np.empty(shape, dtype=dtype)
+
+        if key not in self.__buffers:
+            self.__buffers[key] = np.empty(shape, dtype=dtype)
+        return self.__buffers[key]
+
+    def __load(self, gid: h5py.Group, name: str,
+               out=None) -> xr.DataArray:
+        """Read a CKD parameter into a xarray.DataArray.
+
+        Floating-point parameters are read as double, their fill values are
+        replaced by NaN. Optionally, the parameter is read into array 'out'.
+        """
+        ds_name = f'{gid.name[1:]}/{name}'
+        dset = self.__dset(ds_name)
+        if out is None:
+            out = self.__buffer(ds_name, dset.shape, mem_dtype(dset))
+        if dset.size > 0:
+            self.read_direct(ds_name, out)
+        dims, coords = self.__coords(dset)
+        return xr.DataArray(out, coords=coords, dims=dims, name=name,
+                            attrs=h5_attrs(dset))
+
+    def __load_group(self, gid: h5py.Group, names: tuple) -> list:
+        """Read CKD parameters of one group into xarray.DataArrays.
+
+        Parameters with equal shape and type are read into one contiguous
+        block of memory.
+        """
+        dsets = [self.__dset(f'{gid.name[1:]}/{name}') for name in names]
+        if len({(dset.shape, mem_dtype(dset)) for dset in dsets}) > 1:
+            return [self.__load(gid, name) for name in names]
+
+        block = self.__buffer((gid.name, names),
+                              (len(dsets),) + dsets[0].shape,
+                              mem_dtype(dsets[0]))
+        return [self.__load(gid, name, out=block[ii])
+                for ii, name in enumerate(names)]
 
     def dark(self) -> xr.Dataset:
         """Read Dark CKD.
@@ -114,18 +383,14 @@ class CKDio:
         xarray.Dataset
            parameters of the SPEXone Dark CKD
         """
-        try:
-            gid = self.fid['DARK']
-        except KeyError:
+        if 'DARK' not in self.__groups:
             return None
-        res = ()
+        gid = self.fid['DARK']
         if 'dark_offset' in gid:
-            res += (h5_to_xr(gid['dark_offset']),)
+            names = ('dark_offset', 'dark_current')
         else:
-            res += (h5_to_xr(gid['offset_long']),)
-            res += (h5_to_xr(gid['offset_short']),)
-        res += (h5_to_xr(gid['dark_current']),)
-        return xr.merge(res, combine_attrs='drop_conflicts')
+            names = ('offset_long', 'offset_short', 'dark_current')
+        return to_dataset(self.__load_group(gid, names))
 
     def noise(self) -> xr.Dataset:
         """Read Noise CKD.
@@ -135,14 +400,11 @@ class CKDio:
         xarray.Dataset
            parameters of the SPEXone Noise CKD
         """
-        try:
-            gid = self.fid['NOISE']
-        except KeyError:
+        if 'NOISE' not in self.__groups:
             return None
-        res = ()
-        res += (h5_to_xr(gid['g']),)
-        res += (h5_to_xr(gid['n']),)
-        return xr.merge(res, combine_attrs='drop_conflicts')
+        gid = self.fid['NOISE']
+        res = self.__load_group(gid, ('g', 'n'))
+        return to_dataset(res)
 
     def nlin(self) -> xr.Dataset:
         """Read non-linearity CKD.
@@ -152,17 +414,13 @@ class CKDio:
         xarray.Dataset
            parameters of the SPEXone non-linearity CKD
         """
-        try:
-            gid = self.fid['NON_LINEARITY']
-        except KeyError:
+        if 'NON_LINEARITY' not in self.__groups:
             return None
-        res = ()
-        res += (h5_to_xr(gid['nonlin_order']),)
-        res += (h5_to_xr(gid['nonlin_knots']),)
-        res += (h5_to_xr(gid['nonlin_exptimes']),)
-        res += (h5_to_xr(gid['nonlin_signal_scale']),)
-        res += (h5_to_xr(gid['nonlin_fit']),)
-        return xr.merge(res, combine_attrs='drop_conflicts')
+        gid = self.fid['NON_LINEARITY']
+        res = self.__load_group(gid, ('nonlin_order', 'nonlin_knots',
+                                      'nonlin_exptimes', 'nonlin_signal_scale',
+                                      'nonlin_fit'))
+        return to_dataset(res)
 
     def prnu(self) -> xr.DataArray:
         """Read PRNU CKD.
@@ -172,11 +430,10 @@ class CKDio:
         xr.DataArray
            parameters of the SPEXone PRNU CKD
         """
-        try:
-            gid = self.fid['PRNU']
-        except KeyError:
+        if 'PRNU' not in self.__groups:
             return None
-        return h5_to_xr(gid['prnu'])
+        gid = self.fid['PRNU']
+        return self.__load(gid, 'prnu')
 
     def fov(self) -> xr.Dataset:
         """Read field-of-view CKD.
@@ -186,16 +443,12 @@ class CKDio:
         xarray.Dataset
            parameters of the SPEXone field-of-view CKD
         """
-        try:
-            gid = self.fid['FIELD_OF_VIEW']
-        except KeyError:
+        if 'FIELD_OF_VIEW' not in self.__groups:
             return None
-        res = ()
-        res += (h5_to_xr(gid['fov_nfov_vp']),)
-        res += (h5_to_xr(gid['fov_ifov_start_vp']),)
-        res += (h5_to_xr(gid['fov_act_angles']),)
-        res += (h5_to_xr(gid['fov_ispat']),)
-        return xr.merge(res, combine_attrs='drop_conflicts')
+        gid = self.fid['FIELD_OF_VIEW']
+        res = self.__load_group(gid, ('fov_nfov_vp', 'fov_ifov_start_vp',
+                                      'fov_act_angles', 'fov_ispat'))
+        return to_dataset(res)
 
     def wavelength(self) -> xr.Dataset:
         """Read Wavelength CKD.
@@ -205,17 +458,16 @@ class CKDio:
         xarray.Dataset
            parameters of the SPEXone Wavelength CKD
         """
-        try:
-            gid = self.fid['WAVELENGTH']
-        except KeyError:
+        if 'WAVELENGTH' not in self.__groups:
             return None
-        res = ()
+        gid = self.fid['WAVELENGTH']
+        res = []
         # Before radiometric calibration S and P have separate wavelength grids
-        res += (h5_to_xr(gid['wave_full']),)
+        res.append(self.__load(gid, 'wave_full'))
         # After radiometric calibration S and P are interpolated to a common
         # wavelength grid.
-        res += (h5_to_xr(gid['wave_common']),)
-        return xr.merge(res, combine_attrs='drop_conflicts')
+        res.append(self.__load(gid, 'wave_common'))
+        return to_dataset(res)
 
     def radiometric(self) -> xr.DataArray:
         """Read Radiometric CKD.
@@ -225,11 +477,10 @@ class CKDio:
         xr.DataArray
            parameters of the SPEXone Radiometric CKD
         """
-        try:
-            gid = self.fid['RADIOMETRIC']
-        except KeyError:
+        if 'RADIOMETRIC' not in self.__groups:
             return None
-        return h5_to_xr(gid['rad_spectra'])
+        gid = self.fid['RADIOMETRIC']
+        return self.__load(gid, 'rad_spectra')
 
     def polarimetric(self) -> xr.Dataset:
         """Read Polarimetric CKD.
@@ -239,15 +490,11 @@ class CKDio:
         xarray.Dataset
            parameters of the SPEXone Polarimetric CKD
         """
-        try:
-            gid = self.fid['POLARIMETRIC']
-        except KeyError:
+        if 'POLARIMETRIC' not in self.__groups:
             return None
-        res = ()
-        res += (h5_to_xr(gid['pol_m_q']),)
-        res += (h5_to_xr(gid['pol_m_u']),)
-        res += (h5_to_xr(gid['pol_m_t']),)
-        return xr.merge(res, combine_attrs='drop_conflicts')
+        gid = self.fid['POLARIMETRIC']
+        res = self.__load_group(gid, ('pol_m_q', 'pol_m_u', 'pol_m_t'))
+        return to_dataset(res)
 
 
 # - main function ----------------------------------
@@ -261,7 +508,7 @@ def __test():
     if not ckd_file.is_file():
         raise FileNotFoundError(f'{ckd_file} does not exist')
 
-    with CKDio(ckd_file) as ckd:
+    with CKDio(ckd_file, in_memory=True) as ckd:
         print(ckd.processor_version)
         print(ckd.date_created())
         print('# --- dark ---')
@@ -13,11 +13,14 @@ Collection of routines to read, write or select EGSE data generated by ITOS.
 __all__ = ['create_egse_db', 'add_egse_data']
 
 from datetime import datetime, timedelta, timezone
+import io
 from pathlib import Path
+import re
 
 import h5py
 from netCDF4 import Dataset
 import numpy as np
+import pandas as pd
 
 # - global parameters ------------------------------
 DB_EGSE = 'egse_db_itos.nc'
@@ -29,6 +32,13 @@ LDLS_DICT = {b'UNPLUGGED': 0, b'Controller Fault': 1, b'Idle': 2,
 # enumerate shutter positions
 SHUTTER_DICT = {b'CLOSED': 0, b'OPEN': 1, b'PARTIAL': 255}
 
+# enumeration types as stored in netCDF4 files
+LDLS_ENUM = {k.replace(b' ', b'_').upper(): v for k, v in LDLS_DICT.items()}
+SHUTTER_ENUM = {k.upper(): v for k, v in SHUTTER_DICT.items()}
+
+# clean-up of the EGSE column names: ' nm' -> 'nm' and ' ' -> '_'
+EGSE_NAME_RE = re.compile(' (nm)?')
+
 
 # - local functions --------------------------------
 def init_gse_data(fid):
@@ -86,12 +96,69 @@ def init_gse_data(fid):
     return gid
 
 
-def byte_to_timestamp(str_date: str):
+def egse_name_repl(match: re.Match) -> str:
+    """
+    Return replacement of a space in an EGSE column name
+    """
+    return 'nm' if match.group(1) else '_'
+
+
+def egse_timestamps(column: pd.Series) -> np.ndarray:
+    """
+    Convert a column with EGSE date-time strings (UTC) to timestamps
+
+    Date-time strings have the fixed-width format 'YYYYmmddTHHMMSS.ffffff',
+    their digits are converted with integer arithmetic on the raw bytes
+    """
+    column = column.str.strip()
+    if (column.str.len() == 22).all():
+        digits = column.to_numpy().astype('S22').view('u1').reshape(-1, 22)
+        digits = digits.astype('i8') - ord('0')
+
+        def to_int(i_mn, i_mx):
+            res = digits[:, i_mn]
+            for ii in range(i_mn + 1, i_mx):
+                res = 10 * res + digits[:, ii]
+            return res
+
+        days = ((to_int(0, 4) - 1970).astype('M8[Y]')
+                + (to_int(4, 6) - 1).astype('m8[M]')).astype('M8[D]')
+        days += (to_int(6, 8) - 1).astype('m8[D]')
+        return (86400 * days.astype('i8') + 3600 * to_int(9, 11)
+                + 60 * to_int(11, 13) + to_int(13, 15)
+                + to_int(16, 22) / 1e6)
+
+    tstamp = pd.to_datetime(column, format='%Y%m%dT%H%M%S.%f', utc=True)
+    return ((tstamp - pd.Timestamp(0, tz='UTC'))
+            / pd.Timedelta(seconds=1)).to_numpy()
+
+
+def egse_enum_codes(column: pd.Series, enum_dict: dict) -> np.ndarray:
     """
-    Helper function for numpy.loadtxt() to convert byte-string to timestamp
+    Convert a column with EGSE status strings to enumeration codes
+    """
+    values = column.str.strip().to_numpy()
+    codes = np.full(values.size, 255, dtype='u1')
+    for key, val in enum_dict.items():
+        codes[values == key.decode('ascii')] = val
+    return codes
+
+
+def smart_average(data: np.ndarray, thres_range=0.1) -> float:
+    """
+    Return representative value of an EGSE parameter during a measurement
+
+    Returns the first value when the parameter is constant, the mean when
+    its range is smaller than thres_range, else the median
     """
-    buff = str_date.strip().decode('ascii') + '+00:00'     # date is in UTC
-    return datetime.strptime(buff, '%Y%m%dT%H%M%S.%f%z').timestamp()
+    val_range = np.ptp(data)
+    if val_range == 0:
+        return data[0]
+
+    if val_range < thres_range:
+        return data.mean()
+
+    return np.median(data)
 
 
 def egse_dtype():
@@ -157,64 +224,76 @@ def read_egse(egse_file: str, verbose=False) -> tuple:
     """
     Read EGSE data (tab separated values) to numpy compound array
     """
-    with open(egse_file, 'r', encoding='ascii') as fid:
-        line = None
-        names = []
-        units = []
-        while not line:
-            line = fid.readline().strip()
-            fields = line.split('\t')
-            for field in fields:
-                if field == '':
-                    continue
-                res = field.strip().split(' [')
-                names.append(res[0].replace(' nm', 'nm').replace(' ', '_'))
-                if len(res) == 2:
-                    units.append(res[1].replace('[', '').replace(']', ''))
-                else:
-                    units.append('1')
-
-        if len(names) in (35, 36):
-            # define dtype of the data
-            formats = ('f8',) + 14 * ('f4',) + ('u1',) + 2 * ('i4',)\
-                + ('f4', 'u1',) + 2 * ('u1',) + 3 * ('f4', 'u1',) + 7 * ('u1',)
-            usecols = None
+    # read the whole file at once, the first non-empty line is the header
+    raw = Path(egse_file).read_bytes().lstrip()
+    hdr_end = raw.find(b'\n')
+    if hdr_end == -1:
+        hdr_end = len(raw)
+
+    names = []
+    units = []
+    for field in raw[:hdr_end].decode('ascii').split('\t'):
+        field = field.strip()
+        if field == '':
+            continue
+        res = field.split(' [')
+        names.append(EGSE_NAME_RE.sub(egse_name_repl, res[0]))
+        if len(res) == 2:
+            units.append(res[1].replace('[', '').replace(']', ''))
         else:
-            # define dtype of the data
-            formats = ('f8',) + 14 * ('f4',) + ('u1',) + 2 * ('i4',)\
-                + ('f4', 'u1',) + 2 * ('u1',) + 5 * ('f4', 'u1',) + 7 * ('u1',)
-            usecols = None
-
-        if 'NOMHK_packets_time' in names:
-            formats = ('f8',) + formats
-            convertors = {0: byte_to_timestamp,
-                          1: byte_to_timestamp,
-                          16: lambda s: LDLS_DICT.get(s.strip(), 255),
-                          21: lambda s: SHUTTER_DICT.get(s.strip(), 255)}
+            units.append('1')
+
+    if len(names) in (35, 36):
+        # define dtype of the data
+        formats = ('f8',) + 14 * ('f4',) + ('u1',) + 2 * ('i4',)\
+            + ('f4', 'u1',) + 2 * ('u1',) + 3 * ('f4', 'u1',) + 7 * ('u1',)
+    else:
+        # define dtype of the data
+        formats = ('f8',) + 14 * ('f4',) + ('u1',) + 2 * ('i4',)\
+            + ('f4', 'u1',) + 2 * ('u1',) + 5 * ('f4', 'u1',) + 7 * ('u1',)
+
+    if 'NOMHK_packets_time' in names:
+        formats = ('f8',) + formats
+        tstamp_cols = (0, 1)
+        enum_cols = {16: LDLS_DICT, 21: SHUTTER_DICT}
+    else:
+        tstamp_cols = (0,)
+        enum_cols = {15: LDLS_DICT, 20: SHUTTER_DICT}
+    if verbose:
+        print(len(names), names)
+        print(len(units), units)
+        print(len(formats), formats)
+
+    if not len(names) == len(units) == len(formats):
+        raise RuntimeError('Size of names, units or formats are not equal')
+
+    # timestamps and enumerations are parsed as strings and converted
+    # column-wise, all other columns are parsed by the C engine of pandas
+    dtypes = {name: str if ii in tstamp_cols or ii in enum_cols else fmt
+              for ii, (name, fmt) in enumerate(zip(names, formats))}
+    buff = pd.read_csv(io.BytesIO(raw[hdr_end + 1:]), sep='\t',
+                       header=None, names=names, index_col=False,
+                       dtype=dtypes, engine='c', encoding='ascii')
+
+    # initialize the EGSE records with one default record, because not all
+    # parameters are present in older EGSE files
+    defaults = np.zeros(1, dtype=egse_dtype())
+    defaults['NOMHK_packets_time'] = np.nan
+    defaults['GP_0_ANGLE'] = np.nan
+    defaults['GP_1_ANGLE'] = np.nan
+    defaults['GP_0_MOVING'] = 255
+    defaults['GP_1_MOVING'] = 255
+    egse = np.empty(len(buff), dtype=egse_dtype())
+    egse[:] = defaults
+
+    # copy the parsed columns directly into the EGSE records
+    for ii, name in enumerate(names):
+        if ii in tstamp_cols:
+            egse[name] = egse_timestamps(buff[name])
+        elif ii in enum_cols:
+            egse[name] = egse_enum_codes(buff[name], enum_cols[ii])
         else:
-            convertors = {0: byte_to_timestamp,
-                          15: lambda s: LDLS_DICT.get(s.strip(), 255),
-                          20: lambda s: SHUTTER_DICT.get(s.strip(), 255)}
-        if verbose:
-            print(len(names), names)
-            print(len(units), units)
-            print(len(formats), formats)
-
-        if not len(names) == len(units) == len(formats):
-            raise RuntimeError('Size of names, units or formats are not equal')
-
-        data = np.loadtxt(fid, delimiter='\t',
-                          converters=convertors, usecols=usecols,
-                          dtype={'names': names, 'formats': formats})
-
-    egse = np.empty(data.size, dtype=egse_dtype())
-    egse['NOMHK_packets_time'][:] = np.nan
-    egse['GP_0_ANGLE'][:] = np.nan
-    egse['GP_1_ANGLE'][:] = np.nan
-    egse['GP_0_MOVING'][:] = 255
-    egse['GP_1_MOVING'][:] = 255
-    for name in data.dtype.names:
-        egse[name][:] = data[name][:]
+            egse[name] = buff[name].to_numpy()
 
     return (egse, units)
 
@@ -224,43 +303,46 @@ def create_egse_db(args):
     """
     Write EGSE data to HDF5 database
     """
-    egse = None
+    egse = []
     for egse_file in args.file_list:
         try:
             res = read_egse(egse_file, verbose=args.verbose)
         except RuntimeError:
             return
 
-        egse = res[0] if egse is None else np.concatenate((egse, res[0]))
+        egse.append(res[0])
+    egse = egse[0] if len(egse) == 1 else np.concatenate(egse)
 
     with Dataset(args.egse_dir / DB_EGSE, 'w', format='NETCDF4') as fid:
         fid.input_files = [Path(x).name for x in args.file_list]
         fid.creation_date = \
             datetime.now(timezone.utc).isoformat(timespec='seconds')
 
-        _ = fid.createEnumType('u1', 'ldls_t',
-                               {k.replace(b' ', b'_').upper(): v
-                                for k, v in LDLS_DICT.items()})
-        _ = fid.createEnumType('u1', 'shutter_t',
-                               {k.upper(): v
-                                for k, v in SHUTTER_DICT.items()})
+        _ = fid.createEnumType('u1', 'ldls_t', LDLS_ENUM)
+        _ = fid.createEnumType('u1', 'shutter_t', SHUTTER_ENUM)
+        fid.set_auto_mask(False)
+        chunksizes = (min(4096, egse.size),)
         dset = fid.createDimension('time', egse.size)
         dset = fid.createVariable('time', 'f8', ('time',),
-                                  chunksizes=(256,))
+                                  chunksizes=chunksizes)
 
+        # sort the EGSE records in time
         time_key = 'ITOS_time' if 'ITOS_time' in egse.dtype.names else 'time'
-        indx = np.argsort(egse[time_key])
-        dset[:] = egse[time_key][indx]
-
-        egse_t = fid.createCompoundType(egse.dtype, 'egse_dtype')
-        dset = fid.createVariable('egse', egse_t, ('time',),
-                                  chunksizes=(64,))
-        dset.long_name = 'EGSE settings'
-        dset.fields = np.array([np.string_(n) for n in egse.dtype.names])
-        dset.units = np.array([np.string_(n) for n in egse_units()])
-        dset.comment = ('DIG_IN_00 is of enumType ldls_t;'
-                        ' SHUTTER_STATUS is of enumType shutter_t')
-        dset[:] = egse[indx]
+        egse = np.take(egse, np.argsort(egse[time_key]))
+        dset[:] = egse[time_key]
+
+        # store each EGSE parameter as a separate variable, thus readers
+        # only have to access the parameters they need
+        gid = fid.createGroup('egse')
+        gid.long_name = 'EGSE settings'
+        gid.comment = ('DIG_IN_00 is of enumType ldls_t;'
+                       ' SHUTTER_STATUS is of enumType shutter_t')
+        for name, unit in zip(egse.dtype.names, egse_units()):
+            dset = gid.createVariable(name, egse.dtype[name], ('time',),
+                                      chunksizes=chunksizes, zlib=True,
+                                      complevel=1, shuffle=True)
+            dset.units = unit
+            dset[:] = egse[name]
 
 
 # ----- SELECT OGSE DATA FROM DATABASE AND ADD TO L1A PRODUCT -----
@@ -294,14 +376,17 @@ def add_egse_data(args):
 
     # open EGSE database
     with Dataset(args.egse_dir / DB_EGSE, 'r') as fid:
+        # the EGSE database is sorted in time
         egse_time = fid['time'][:].data
-        mask = ((egse_time >= msmt_start.timestamp())
-                & (egse_time <= msmt_stop.timestamp()))
-        if mask.sum() == 0:
+        i_mn = np.searchsorted(egse_time, msmt_start.timestamp(), side='left')
+        i_mx = np.searchsorted(egse_time, msmt_stop.timestamp(), side='right')
+        if i_mx <= i_mn:
             raise RuntimeError('no EGSE data found')
 
-        egse_time = egse_time[mask]
-        egse_data = fid['egse'][mask]
+        egse_time = egse_time[i_mn:i_mx]
+        egse_data = np.empty(egse_time.size, dtype=egse_dtype())
+        for name in egse_data.dtype.names:
+            egse_data[name] = fid['egse'][name][i_mn:i_mx]
 
     # update Level-1A product with EGSE information
     with Dataset(args.l1a_file, 'r+') as fid:
@@ -309,12 +394,8 @@ def add_egse_data(args):
             gid = fid['/gse_data']
         else:
             gid = init_gse_data(fid)
-        _ = gid.createEnumType('u1', 'ldls_t',
-                               {k.replace(b' ', b'_').upper(): v
-                                for k, v in LDLS_DICT.items()})
-        _ = gid.createEnumType('u1', 'shutter_t',
-                               {k.upper(): v
-                                for k, v in SHUTTER_DICT.items()})
+        _ = gid.createEnumType('u1', 'ldls_t', LDLS_ENUM)
+        _ = gid.createEnumType('u1', 'shutter_t', SHUTTER_ENUM)
         dset = gid.createDimension('time', egse_data.size)
         dset = gid.createVariable('time', 'f8', ('time',))
         dset[:] = egse_time
@@ -328,16 +409,6 @@ def add_egse_data(args):
                         ' SHUTTER_STATUS is of enumType shutter_t')
         dset[:] = egse_data
 
-        def smart_average(data, thres_range=0.1):
-            val_range = np.abs(data.max() - data.min())
-            if val_range == 0:
-                return data[0]
-
-            if val_range < thres_range:
-                return np.mean(data)
-
-            return np.median(data)
-
         fid['/gse_data'].ACT_rotationAngle = \
             smart_average(egse_data['ACT_ANGLE'])
         fid['/gse_data'].ALT_rotationAngle = \
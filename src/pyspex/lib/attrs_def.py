@@ -13,32 +13,17 @@ Provides the common global-attributes for SPEXone Level-1 products.
 __all__ = ['attrs_def']
 
 from datetime import datetime, timezone
+from functools import lru_cache
+from types import MappingProxyType
 
 from pyspex import version
 
 
-# - main functions --------------------------------
-def attrs_def(level: str, inflight=True, origin=None) -> dict:
+# - local functions --------------------------------
+@lru_cache(maxsize=8)
+def __attrs_def(level: str, inflight: bool, origin: str) -> MappingProxyType:
+    """Returns the global attributes which do not change between products.
     """
-    Defines all global attributes for SPEXone Level-1 products.
-
-    Parameters
-    ----------
-    level : str
-       Product processing level 'L1A', 'L1B' or 'L1C'
-    inflight : bool
-       Flag for in-flight or on-ground products
-    origin : str
-       Product origin: 'SRON' or 'NASA'
-
-    Returns
-    -------
-    dict
-       Global attributes for a Level-1A product
-    """
-    if origin is None:
-        origin = 'NASA' if inflight else 'SRON'
-
     res = {
         "title": f"PACE SPEX Level-{level[1:]} data",
         "instrument": "SPEX",
@@ -70,8 +55,7 @@ def attrs_def(level: str, inflight=True, origin=None) -> dict:
         "end_direction": "Ascending" if inflight else None,
         "time_coverage_start": "yyyy-mm-ddTHH:MM:DD",
         "time_coverage_end": "yyyy-mm-ddTHH:MM:DD",
-        "date_created": datetime.now(timezone.utc).isoformat(
-            timespec='milliseconds'),
+        "date_created": None,
         "software_name": 'https://github.com/rmvanhees/pyspex',
         "software_version": version.get(),
         "sun_earth_distance": None,
@@ -93,4 +77,32 @@ def attrs_def(level: str, inflight=True, origin=None) -> dict:
         res['publisher_email'] = "SPEXone-MPC@sron.nl"
         res['publisher_url'] = "https://www.sron.nl/missions-earth/pace-spexone"
 
+    return MappingProxyType(res)
+
+
+# - main functions --------------------------------
+def attrs_def(level: str, inflight=True, origin=None) -> dict:
+    """
+    Defines all global attributes for SPEXone Level-1 products.
+
+    Parameters
+    ----------
+    level : str
+       Product processing level 'L1A', 'L1B' or 'L1C'
+    inflight : bool
+       Flag for in-flight or on-ground products
+    origin : str
+       Product origin: 'SRON' or 'NASA'
+
+    Returns
+    -------
+    dict
+       Global attributes for a Level-1A product
+    """
+    if origin is None:
+        origin = 'NASA' if inflight else 'SRON'
+
+    res = dict(__attrs_def(level, inflight, origin))
+    res['date_created'] = datetime.now(timezone.utc).isoformat(
+        timespec='milliseconds')
     return res
@@ -72,7 +72,8 @@ def attrs_sec_per_day(dset, ref_date: datetime.date) -> None:
 
 # - main function ----------------------------------
 # pylint: disable=too-many-statements
-def init_l1a(l1a_flname: str, ref_date: datetime.date, dims: dict) -> None:
+def init_l1a(l1a_flname: str, ref_date: datetime.date, dims: dict,
+             in_memory=False, compress=True) -> None:
     """
     Create an empty SPEXone Level-1A product (on-ground or in-flight)
 
@@ -89,6 +90,12 @@ def init_l1a(l1a_flname: str, ref_date: datetime.date, dims: dict) -> None:
           samples_per_image : None    # depends on binning table
           hk_packets : None           # number of HK tlm-packets (1 Hz)
 
+    in_memory :  bool, default=False
+       Create the product in memory, it is written to disk when it is closed.
+       The product should fit in memory
+    compress :  bool, default=True
+       Compress the detector images (shuffle and zlib, level 2)
+
     Notes
     -----
     Original CDL definition is from F. S. Patt (GSFC), 08-Feb-2019
@@ -110,22 +117,38 @@ def init_l1a(l1a_flname: str, ref_date: datetime.date, dims: dict) -> None:
         hk_packets = dims['hk_packets']
 
     # create/overwrite netCDF4 product
-    rootgrp = Dataset(l1a_flname, 'w')
+    rootgrp = Dataset(l1a_flname, 'w',
+                      diskless=in_memory, persist=in_memory)
 
     # - define global dimensions
     _ = rootgrp.createDimension('number_of_images', number_img)
     _ = rootgrp.createDimension('samples_per_image', img_samples)
     _ = rootgrp.createDimension('hk_packets', hk_packets)
 
+    # - define chunk sizes of the variables along unlimited dimensions
+    # the time series are written in chunks of 4-32 KiB and the compound
+    # telemetry records in chunks of about 150 KiB
+    img_chunks = None if number_img is not None else (512,)
+    hk_chunks = None if hk_packets is not None else (4096,)
+    nomhk_chunks = None if hk_packets is not None else (512,)
+
+    # - variables along an unlimited dimension only hold the written records,
+    # these are not pre-filled. Variables with a fixed size keep the default
+    # pre-fill, because parts of them may never be written
+    img_fill = False if number_img is None else None
+    hk_fill = False if hk_packets is None else None
+
     # - define group /image_attributs and its datasets
     sgrp = rootgrp.createGroup('/image_attributes')
-    dset = sgrp.createVariable('icu_time_sec', 'u4', ('number_of_images',))
+    dset = sgrp.createVariable('icu_time_sec', 'u4', ('number_of_images',),
+                               chunksizes=img_chunks, fill_value=img_fill)
     dset.long_name = "ICU time stamp (seconds)"
     dset.description = "Science TM parameter ICU_TIME_SEC"
     dset.valid_min = np.uint32(1956528000)  # year 2020
     dset.valid_max = np.uint32(2493072000)  # year 2037
     dset.units = "seconds since 1958-01-01 00:00:00 TAI"
-    dset = sgrp.createVariable('icu_time_subsec', 'u2', ('number_of_images',))
+    dset = sgrp.createVariable('icu_time_subsec', 'u2', ('number_of_images',),
+                               chunksizes=img_chunks, fill_value=img_fill)
     dset.long_name = "ICU time stamp (sub-seconds)"
     dset.description = "Science TM parameter ICU_TIME_SUBSEC"
     dset.valid_min = np.uint16(0)
@@ -133,71 +156,85 @@ def init_l1a(l1a_flname: str, ref_date: datetime.date, dims: dict) -> None:
     dset.units = "1/65536 s"
 
     dset = sgrp.createVariable('image_time', 'f8', ('number_of_images',),
-                               fill_value=-32767)
+                               fill_value=-32767, chunksizes=img_chunks)
     dset.long_name = "Image time"
     dset.description = "Integration start time in seconds of day"
     attrs_sec_per_day(dset, ref_date)
-    dset = sgrp.createVariable('image_ID', 'i4', ('number_of_images',))
+    dset = sgrp.createVariable('image_ID', 'i4', ('number_of_images',),
+                               chunksizes=img_chunks, fill_value=img_fill)
     dset.long_name = "Image counter from power-up"
     dset.valid_min = np.int32(0)
     dset.valid_max = np.int32(0x7FFFFFFF)
-    dset = sgrp.createVariable('binning_table', 'u1', ('number_of_images',))
+    dset = sgrp.createVariable('binning_table', 'u1', ('number_of_images',),
+                               chunksizes=img_chunks, fill_value=img_fill)
     dset.long_name = "Binning-table ID"
     dset.valid_min = np.uint8(0)
     dset.valid_max = np.uint8(0xFF)
-    dset = sgrp.createVariable('digital_offset', 'i2', ('number_of_images',))
+    dset = sgrp.createVariable('digital_offset', 'i2', ('number_of_images',),
+                               chunksizes=img_chunks, fill_value=img_fill)
     dset.long_name = "Digital offset"
     dset.units = "1"
     dset = sgrp.createVariable('nr_coadditions', 'u2', ('number_of_images',),
-                               fill_value=0)
+                               fill_value=0, chunksizes=img_chunks)
     dset.long_name = "number of coadditions"
     dset.valid_min = np.int32(1)
     dset.units = "1"
     dset = sgrp.createVariable('exposure_time', 'f8', ('number_of_images',),
-                               fill_value=0)
+                               fill_value=0, chunksizes=img_chunks)
     dset.long_name = "exposure time"
     dset.units = "s"
 
     # - define group /science_data and its datasets
     sgrp = rootgrp.createGroup('/science_data')
-    chunksizes = None if number_img is not None else (1, img_samples)
+    # - one chunk per image, leave the chunking to netCDF when the number of
+    # samples per image is not known in advance
+    chunksizes = None
+    if img_samples is not None and (number_img is None or compress):
+        chunksizes = (1, img_samples)
     dset = sgrp.createVariable('detector_images', 'u2',
                                ('number_of_images', 'samples_per_image'),
-                               chunksizes=chunksizes, fill_value=0xFFFF)
+                               chunksizes=chunksizes, zlib=compress,
+                               shuffle=compress, complevel=2,
+                               fill_value=0xFFFF)
     dset.long_name = "Detector pixel values"
     dset.valid_min = np.uint16(0)
     dset.valid_max = np.uint16(0xFFFE)
     dset.units = "counts"
     hk_dtype = rootgrp.createCompoundType(tmtc_dtype(0x350), 'science_dtype')
     dset = sgrp.createVariable('detector_telemetry', hk_dtype,
-                               dimensions=('number_of_images',))
+                               dimensions=('number_of_images',),
+                               chunksizes=img_chunks, fill_value=img_fill)
     dset.long_name = "SPEX science telemetry"
     dset.comment = "a subset of MPS and housekeeping parameters"
 
     # - define group /engineering_data and its datasets
     sgrp = rootgrp.createGroup('/engineering_data')
     dset = sgrp.createVariable('HK_tlm_time', 'f8', ('hk_packets',),
-                               fill_value=-32767)
+                               fill_value=-32767, chunksizes=hk_chunks)
     dset.long_name = "HK telemetry packet time"
     dset.description = "packaging time in seconds of day"
     attrs_sec_per_day(dset, ref_date)
     hk_dtype = rootgrp.createCompoundType(tmtc_dtype(0x320), 'nomhk_dtype')
-    dset = sgrp.createVariable('NomHK_telemetry', hk_dtype, ('hk_packets',))
+    dset = sgrp.createVariable('NomHK_telemetry', hk_dtype, ('hk_packets',),
+                               chunksizes=nomhk_chunks, fill_value=hk_fill)
     dset.long_name = "SPEX nominal-HK telemetry"
     dset.comment = "an extended subset of the housekeeping parameters"
-    dset = sgrp.createVariable('temp_detector', 'f4', ('hk_packets',))
+    dset = sgrp.createVariable('temp_detector', 'f4', ('hk_packets',),
+                               chunksizes=hk_chunks, fill_value=hk_fill)
     dset.long_name = "Detector temperature"
     dset.comment = "TS1 DEM Temperature (nominal)"
     dset.valid_min = 260
     dset.valid_max = 300
     dset.units = "K"
-    dset = sgrp.createVariable('temp_housing', 'f4', ('hk_packets',))
+    dset = sgrp.createVariable('temp_housing', 'f4', ('hk_packets',),
+                               chunksizes=hk_chunks, fill_value=hk_fill)
     dset.long_name = "Housing temperature"
     dset.comment = "TS2 Housing Temperature (nominal)"
     dset.valid_min = 260
     dset.valid_max = 300
     dset.units = "K"
-    dset = sgrp.createVariable('temp_radiator', 'f4', ('hk_packets',))
+    dset = sgrp.createVariable('temp_radiator', 'f4', ('hk_packets',),
+                               chunksizes=hk_chunks, fill_value=hk_fill)
     dset.long_name = "Radiator temperature"
     dset.comment = "TS3 Radiator Temperature (nominal)"
     dset.valid_min = 260
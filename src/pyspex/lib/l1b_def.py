@@ -24,7 +24,8 @@ ORBIT_DURATION = 5904  # seconds
 
 # - main function ----------------------------------
 # pylint: disable=too-many-statements
-def init_l1b(l1b_flname: str, ref_date: datetime.date, dims: dict) -> None:
+def init_l1b(l1b_flname: str, ref_date: datetime.date, dims: dict,
+             in_memory=False) -> None:
     """
     Create an empty PACE SPEX Level-1B product
 
@@ -43,6 +44,9 @@ def init_l1b(l1b_flname: str, ref_date: datetime.date, dims: dict) -> None:
           intensity_bands_per_view: 50
           polarization_bands_per_view: 50
 
+    in_memory :  bool, default=False
+       Create the product in memory, it is written to disk when it is closed.
+       The product should fit in memory
     """
     # check function parameters
     if not isinstance(dims, dict):
@@ -65,7 +69,8 @@ def init_l1b(l1b_flname: str, ref_date: datetime.date, dims: dict) -> None:
         n_polar_bands = dims['polarization_bands_per_view']
 
     # create/overwrite netCDF4 product
-    rootgrp = Dataset(l1b_flname, "w")
+    rootgrp = Dataset(l1b_flname, "w",
+                      diskless=in_memory, persist=in_memory)
 
     # create global dimensions
     _ = rootgrp.createDimension('number_of_views', n_views)
@@ -74,6 +79,11 @@ def init_l1b(l1b_flname: str, ref_date: datetime.date, dims: dict) -> None:
     _ = rootgrp.createDimension('intensity_bands_per_view', n_intens_bands)
     _ = rootgrp.createDimension('polarization_bands_per_view', n_polar_bands)
 
+    # variables along an unlimited dimension only hold the written records,
+    # these are not pre-filled. Variables with a fixed size keep the default
+    # pre-fill, because parts of them may never be written
+    bin_fill = False if n_bins_along is None else None
+
     # create groups and all variables with attributes
     sgrp = rootgrp.createGroup('BIN_ATTRIBUTES')
     chunksizes = None if n_bins_along is not None else (512,)
@@ -98,7 +108,7 @@ def init_l1b(l1b_flname: str, ref_date: datetime.date, dims: dict) -> None:
     dset = sgrp.createVariable('altitude', 'f4',
                                ('bins_along_track',
                                 'spatial_samples_per_image'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.standard_name = 'altitude'
     dset.long_name = "height above mean sea level"
     dset.units = "m"
@@ -107,7 +117,7 @@ def init_l1b(l1b_flname: str, ref_date: datetime.date, dims: dict) -> None:
     dset = sgrp.createVariable('latitude', 'f4',
                                ('bins_along_track',
                                 'spatial_samples_per_image'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.standard_name = 'latitude'
     dset.long_name = 'latitude'
     dset.valid_min = -90
@@ -116,7 +126,7 @@ def init_l1b(l1b_flname: str, ref_date: datetime.date, dims: dict) -> None:
     dset = sgrp.createVariable('longitude', 'f4',
                                ('bins_along_track',
                                 'spatial_samples_per_image'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.standard_name = 'longitude'
     dset.long_name = 'longitude'
     dset.valid_min = -180
@@ -125,25 +135,25 @@ def init_l1b(l1b_flname: str, ref_date: datetime.date, dims: dict) -> None:
     dset = sgrp.createVariable('sensor_azimuth', 'f4',
                                ('bins_along_track',
                                 'spatial_samples_per_image'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'sensor azimuth angle'
     dset.units = 'degree'
     dset = sgrp.createVariable('sensor_zenith', 'f4',
                                ('bins_along_track',
                                 'spatial_samples_per_image'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'sensor zenith angle'
     dset.units = 'degree'
     dset = sgrp.createVariable('solar_azimuth', 'f4',
                                ('bins_along_track',
                                 'spatial_samples_per_image'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'solar azimuth angle'
     dset.units = 'degree'
     dset = sgrp.createVariable('solar_zenith', 'f4',
                                ('bins_along_track',
                                 'spatial_samples_per_image'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'solar zenith angle'
     dset.units = 'degree'
 
@@ -154,13 +164,13 @@ def init_l1b(l1b_flname: str, ref_date: datetime.date, dims: dict) -> None:
     dset = sgrp.createVariable('I', 'f4',
                                ('bins_along_track', 'spatial_samples_per_image',
                                 'intensity_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'I Stokes vector component'
     dset.units = 'W/(m^2.sr.um)'
     dset = sgrp.createVariable('I_noise', 'f4',
                                ('bins_along_track', 'spatial_samples_per_image',
                                 'intensity_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'random noise of I'
     dset.units = 'W/(m^2.sr.um)'
 
@@ -169,49 +179,49 @@ def init_l1b(l1b_flname: str, ref_date: datetime.date, dims: dict) -> None:
     dset = sgrp.createVariable('Q_over_I', 'f4',
                                ('bins_along_track', 'spatial_samples_per_image',
                                 'polarization_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'Q over I (little q) Stokes vector component'
     dset.units = '1'
     dset = sgrp.createVariable('Q_over_I_noise', 'f4',
                                ('bins_along_track', 'spatial_samples_per_image',
                                 'polarization_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'random noise of Q_over_I'
     dset.units = '1'
     dset = sgrp.createVariable('U_over_I', 'f4',
                                ('bins_along_track', 'spatial_samples_per_image',
                                 'polarization_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'U over I (little u) Stokes vector component'
     dset.units = '1'
     dset = sgrp.createVariable('U_over_I_noise', 'f4',
                                ('bins_along_track', 'spatial_samples_per_image',
                                 'polarization_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'random noise of U_over_I'
     dset.units = '1'
     dset = sgrp.createVariable('AoLP', 'f4',
                                ('bins_along_track', 'spatial_samples_per_image',
                                 'polarization_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'angle of linear polarization'
     dset.units = 'degree'
     dset = sgrp.createVariable('AoLP_noise', 'f4',
                                ('bins_along_track', 'spatial_samples_per_image',
                                 'polarization_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'random noise of AoLP'
     dset.units = 'degree'
     dset = sgrp.createVariable('DoLP', 'f4',
                                ('bins_along_track', 'spatial_samples_per_image',
                                 'polarization_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'degree of linear polarization'
     dset.units = '1'
     dset = sgrp.createVariable('DoLP_noise', 'f4',
                                ('bins_along_track', 'spatial_samples_per_image',
                                 'polarization_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'random noise of DoLP'
     dset.units = '1'
 
@@ -26,7 +26,8 @@ ORBIT_DURATION = 5904  # seconds
 
 # - main function ----------------------------------
 # pylint: disable=too-many-statements
-def init_l1c(l1c_flname: str, ref_date: datetime.date, dims: dict) -> None:
+def init_l1c(l1c_flname: str, ref_date: datetime.date, dims: dict,
+             in_memory=False) -> None:
     """
     Create an empty PACE SPEX Level-1C product
 
@@ -44,6 +45,10 @@ def init_l1c(l1c_flname: str, ref_date: datetime.date, dims: dict) -> None:
           spatial_samples_per_image: 200
           intensity_bands_per_view: 50
           polarization_bands_per_view: 50
+
+    in_memory :  bool, default=False
+       Create the product in memory, it is written to disk when it is closed.
+       The product should fit in memory
     """
     # check function parameters
     if not isinstance(dims, dict):
@@ -66,7 +71,8 @@ def init_l1c(l1c_flname: str, ref_date: datetime.date, dims: dict) -> None:
         n_polar_bands = dims['polarization_bands_per_view']
 
     # create/overwrite netCDF4 product
-    rootgrp = Dataset(l1c_flname, "w")
+    rootgrp = Dataset(l1c_flname, "w",
+                      diskless=in_memory, persist=in_memory)
 
     # create global dimensions
     _ = rootgrp.createDimension('intensity_bands_per_view', n_intens_bands)
@@ -75,11 +81,17 @@ def init_l1c(l1c_flname: str, ref_date: datetime.date, dims: dict) -> None:
     _ = rootgrp.createDimension('bins_along_track', n_bins_along)
     _ = rootgrp.createDimension('number_of_views', n_views)
 
+    # variables along an unlimited dimension only hold the written records,
+    # these are not pre-filled. Variables with a fixed size keep the default
+    # pre-fill, because parts of them may never be written
+    bin_fill = False if n_bins_along is None else None
+
     # create groups and all variables with attributes
     sgrp = rootgrp.createGroup('BIN_ATTRIBUTES')
     chunksizes = None if n_bins_along is not None else (512,)
     dset = sgrp.createVariable('nadir_view_time', 'f8',
-                               ('bins_along_track',), chunksizes=chunksizes)
+                               ('bins_along_track',), chunksizes=chunksizes,
+                               fill_value=bin_fill)
     dset.long_name = 'Nadir view time'
     dset.description = "time when bin was viewed at nadir"
     dset.valid_min = 0
@@ -96,7 +108,8 @@ def init_l1c(l1c_flname: str, ref_date: datetime.date, dims: dict) -> None:
     chunksizes = None if n_bins_along is not None else (512, n_bins_across)
     dset = sgrp.createVariable('view_time_offsets', 'f8',
                                ('bins_along_track', 'bins_across_track',
-                                'number_of_views'), chunksizes=chunksizes)
+                                'number_of_views'), chunksizes=chunksizes,
+                               fill_value=bin_fill)
     dset.long_name = "time offsets of views"
     dset.description = "offset of views wrt nadir view"
     dset.valid_min = -200
@@ -107,7 +120,7 @@ def init_l1c(l1c_flname: str, ref_date: datetime.date, dims: dict) -> None:
     sgrp = rootgrp.createGroup('GEOLOCATION_DATA')
     dset = sgrp.createVariable('altitude', 'f4',
                                ('bins_along_track', 'bins_across_track'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.standard_name = 'altitude'
     dset.long_name = "altitude at bin locations"
     dset.units = "m"
@@ -115,12 +128,12 @@ def init_l1c(l1c_flname: str, ref_date: datetime.date, dims: dict) -> None:
     dset.axis = "Z"
     dset = sgrp.createVariable('altitude_variability', 'f4',
                                ('bins_along_track', 'bins_across_track'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'RMS variability of altitude at bin locations'
     dset.units = 'm'
     dset = sgrp.createVariable('latitude', 'f4',
                                ('bins_along_track', 'bins_across_track'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.standard_name = 'latitude'
     dset.long_name = 'latitudes of bin locations'
     dset.valid_min = -90
@@ -128,7 +141,7 @@ def init_l1c(l1c_flname: str, ref_date: datetime.date, dims: dict) -> None:
     dset.units = 'degrees_north'
     dset = sgrp.createVariable('longitude', 'f4',
                                ('bins_along_track', 'bins_across_track'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.standard_name = 'longitude'
     dset.long_name = 'longitude of bin locations'
     dset.valid_min = -180
@@ -138,24 +151,28 @@ def init_l1c(l1c_flname: str, ref_date: datetime.date, dims: dict) -> None:
         else (512, n_bins_across, n_views)
     dset = sgrp.createVariable('sensor_azimuth', 'f4',
                                ('bins_along_track', 'bins_across_track',
-                                'number_of_views'), chunksizes=chunksizes)
+                                'number_of_views'), chunksizes=chunksizes,
+                               fill_value=bin_fill)
     dset.long_name = 'sensor azimuth angle at bin locations'
     dset.comment = 'clockwise from north'
     dset.units = 'degree'
     dset = sgrp.createVariable('sensor_zenith', 'f4',
                                ('bins_along_track', 'bins_across_track',
-                                'number_of_views'), chunksizes=chunksizes)
+                                'number_of_views'), chunksizes=chunksizes,
+                               fill_value=bin_fill)
     dset.long_name = 'sensor zenith angle at bin locations'
     dset.units = 'degree'
     dset = sgrp.createVariable('solar_azimuth', 'f4',
                                ('bins_along_track', 'bins_across_track',
-                                'number_of_views'), chunksizes=chunksizes)
+                                'number_of_views'), chunksizes=chunksizes,
+                               fill_value=bin_fill)
     dset.long_name = 'solar azimuth angle at bin locations'
     dset.comment = 'clockwise from north'
     dset.units = 'degree'
     dset = sgrp.createVariable('solar_zenith', 'f4',
                                ('bins_along_track', 'bins_across_track',
-                                'number_of_views'), chunksizes=chunksizes)
+                                'number_of_views'), chunksizes=chunksizes,
+                               fill_value=bin_fill)
     dset.long_name = 'solar zenith angle at bin locations'
     dset.units = 'degree'
 
@@ -165,7 +182,8 @@ def init_l1c(l1c_flname: str, ref_date: datetime.date, dims: dict) -> None:
         (32, n_bins_across, n_views)
     dset = sgrp.createVariable('obs_per_view', 'i2',
                                ('bins_along_track', 'bins_across_track',
-                                'number_of_views'), chunksizes=chunksizes)
+                                'number_of_views'), chunksizes=chunksizes,
+                               fill_value=bin_fill)
     dset.long_name = 'observations contributing to bin from each view'
     dset.valid_min = 0
     dset.units = '1'
@@ -175,25 +193,25 @@ def init_l1c(l1c_flname: str, ref_date: datetime.date, dims: dict) -> None:
     dset = sgrp.createVariable('AoLP', 'f4',
                                ('bins_along_track', 'bins_across_track',
                                 'number_of_views', 'pol_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'angle of linear polarization'
     dset.units = 'degree'
     dset = sgrp.createVariable('AoLP_noise', 'f4',
                                ('bins_along_track', 'bins_across_track',
                                 'number_of_views', 'pol_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'random noise of AOLP in bin'
     dset.units = '1'
     dset = sgrp.createVariable('DoLP', 'f4',
                                ('bins_along_track', 'bins_across_track',
                                 'number_of_views', 'pol_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'degree of linear polarization'
     dset.units = '1'
     dset = sgrp.createVariable('DoLP_noise', 'f4',
                                ('bins_along_track', 'bins_across_track',
                                 'number_of_views', 'pol_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'random noise of DOLP in bin'
     dset.units = '1'
     chunksizes = None if n_bins_along is not None \
@@ -201,13 +219,13 @@ def init_l1c(l1c_flname: str, ref_date: datetime.date, dims: dict) -> None:
     dset = sgrp.createVariable('I', 'f4',
                                ('bins_along_track', 'bins_across_track',
                                 'number_of_views', 'intensity_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'I Stokes vector component'
     dset.units = 'W/(m^2.sr.um)'
     dset = sgrp.createVariable('I_noise', 'f4',
                                ('bins_along_track', 'bins_across_track',
                                 'number_of_views', 'intensity_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'random noise of I in bin'
     dset.units = 'W/(m^2.sr.um)'
     chunksizes = None if n_bins_along is not None \
@@ -215,14 +233,14 @@ def init_l1c(l1c_flname: str, ref_date: datetime.date, dims: dict) -> None:
     dset = sgrp.createVariable('I_polsample', 'f4',
                                ('bins_along_track', 'bins_across_track',
                                 'number_of_views', 'pol_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = \
         'I Stokes vector component at polarization band spectal sampling'
     dset.units = 'W/(m^2.sr.um)'
     dset = sgrp.createVariable('I_polsample_noise', 'f4',
                                ('bins_along_track', 'bins_across_track',
                                 'number_of_views', 'pol_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'random noise of I_polsample in bin'
     dset.units = 'W/(m^2.sr.um)'
     chunksizes = None if n_bins_along is not None \
@@ -230,7 +248,7 @@ def init_l1c(l1c_flname: str, ref_date: datetime.date, dims: dict) -> None:
     dset = sgrp.createVariable('QC', 'f4',
                                ('bins_along_track', 'bins_across_track',
                                 'number_of_views', 'intensity_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'quality indicator'
     dset.valid_min = 0
     dset.valid_max = 10
@@ -249,7 +267,7 @@ def init_l1c(l1c_flname: str, ref_date: datetime.date, dims: dict) -> None:
     dset = sgrp.createVariable('QC_polsample', 'f4',
                                ('bins_along_track', 'bins_across_track',
                                 'number_of_views', 'pol_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'quality indicator at polarization band spectal sampling'
     dset.valid_min = 0
     dset.valid_max = 10
@@ -266,25 +284,25 @@ def init_l1c(l1c_flname: str, ref_date: datetime.date, dims: dict) -> None:
     dset = sgrp.createVariable('Q_over_I', 'f4',
                                ('bins_along_track', 'bins_across_track',
                                 'number_of_views', 'pol_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'Q_over_I (little q) Stokes vector component'
     dset.units = '1'
     dset = sgrp.createVariable('Q_over_I_noise', 'f4',
                                ('bins_along_track', 'bins_across_track',
                                 'number_of_views', 'pol_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'random noise of Q_over_I in bin'
     dset.units = '1'
     dset = sgrp.createVariable('U_over_I', 'f4',
                                ('bins_along_track', 'bins_across_track',
                                 'number_of_views', 'pol_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'U_over_I (little u) Stokes vector component'
     dset.units = '1'
     dset = sgrp.createVariable('U_over_I_noise', 'f4',
                                ('bins_along_track', 'bins_across_track',
                                 'number_of_views', 'pol_bands_per_view'),
-                               chunksizes=chunksizes)
+                               chunksizes=chunksizes, fill_value=bin_fill)
     dset.long_name = 'random noise of U_over_I in bin'
     dset.units = '1'
 
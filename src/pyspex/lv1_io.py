@@ -14,7 +14,7 @@ PACE/SPEXone data in resp. Level-1A, Level-1B or Level-1C format.
 __all__ = ['L1Aio', 'L1Bio', 'L1Cio']
 
 from datetime import datetime, timedelta, timezone
-from pathlib import Path, PurePosixPath
+from pathlib import Path
 
 import numpy as np
 
@@ -30,12 +30,20 @@ from .lib.l1c_def import init_l1c
 
 
 # - local functions ---------------------
+def encode_attr(value):
+    """Return strings as ASCII-encoded bytes, other values unchanged.
+    """
+    return value.encode('ascii') if isinstance(value, str) else value
+
+
 def frac_poly(xx_in, coefs=None):
     """Temperature [K] calibration derived by Paul Tol (2020-10-21).
 
     Parameters
     ----------
-    xdata :  ndarray
+    xdata :  array_like
+      raw thermistor readings, a scalar or an array of any shape, e.g. (k, n)
+      to convert k temperature channels at once
     coefs :  tuple, default=None
       coefficients of fractional polynomial: r0, r1, r2, r3, r4
 
@@ -43,16 +51,25 @@ def frac_poly(xx_in, coefs=None):
     -------
     ndarray, dtype float
     """
-    xdata = xx_in.astype(float)
+    xdata = np.asarray(xx_in, dtype=float)
 
     if coefs is None:
         coefs = (273.15 + 21.19, 6.97828e+7,
                  -3.53275e-25, 7.79625e-31, -4.6505E-32)
 
-    return (coefs[0]
-            + coefs[1] / xdata
-            + coefs[2] * xdata ** 4
-            + (coefs[3] + coefs[4] * np.log(xdata)) * xdata ** 5)
+    # evaluate the polynomial in-place, using only two temporary arrays
+    # (buff is always an array, also for scalar input, see np.divide below)
+    buff = np.multiply(xdata, xdata, out=np.empty_like(xdata))
+    buff *= buff
+    res = np.log(xdata)
+    res *= coefs[4]
+    res += coefs[3]
+    res *= xdata
+    res += coefs[2]
+    res *= buff
+    res += np.divide(coefs[1], xdata, out=buff)
+    res += coefs[0]
+    return res
 
 
 # - class LV1io -------------------------
@@ -68,18 +85,30 @@ class Lv1io:
     dims :  dict
     append :  bool, default=False
         do no clobber, but add new data to existing product
+    in_memory :  bool, default=False
+        create the product in memory and write it to disk when it is closed,
+        the product should fit in memory (ignored in append mode)
+    compress :  bool, default=True
+        compress the detector images (L1A only, ignored in append mode)
 
     Notes
     -----
     The engineering data should be extended, suggestions:
     * Temperatures of a.o. detector, FEE, optica, obm, telescope
     * Instrument settings: exposure time, dead time, frame time, coadding, ...
+
+    Variables along an unlimited dimension are not pre-filled, use the size
+    of that dimension to detect incomplete products, not the fill values.
     """
     processing_level = 'unknown'
+    time_dim = None        # first dimension of the time variable
+    time_var = None        # variable used to derive the time coverage
+    allow_empty = False    # allow empty variables in a closed product
     dset_stored = {}
 
     def __init__(self, product: str, ref_date: datetime.date,
-                 dims: dict, append=False):
+                 dims: dict, append=False, in_memory=False,
+                 compress=True):
         """Initialize access to a SPEXone Level-1 product.
         """
         self.product = Path(product)
@@ -88,23 +117,38 @@ class Lv1io:
         # initialize private class-attributes
         self.__epoch = ref_date
 
+        # number of elements stored per variable, counted per product
+        self.dset_stored = dict.fromkeys(type(self).dset_stored, 0)
+
         # initialize Level-1 product
         if not append:
             if self.processing_level == 'L1A':
-                self.fid = init_l1a(product, ref_date, dims)
+                self.fid = init_l1a(product, ref_date, dims,
+                                    in_memory=in_memory, compress=compress)
             elif self.processing_level == 'L1B':
-                self.fid = init_l1b(product, ref_date, dims)
+                self.fid = init_l1b(product, ref_date, dims,
+                                    in_memory=in_memory)
             elif self.processing_level == 'L1C':
-                self.fid = init_l1c(product, ref_date, dims)
+                self.fid = init_l1c(product, ref_date, dims,
+                                    in_memory=in_memory)
             else:
                 raise KeyError('valid processing levels are: L1A, L1B or L1C')
         else:
             # open Level-1 product in append mode
             self.fid = Dataset(self.product, "r+")
 
-            # store current length of the first dimension
-            for key in self.dset_stored:
-                self.dset_stored[key] = self.fid[key].shape[0]
+        # cache handles and dimensions of the Level-1 variables
+        self.__vars = {key: self.fid[key] for key in self.dset_stored}
+        self.__dims = {key: var.get_dims() for key, var in self.__vars.items()}
+
+        if append:
+            # store current length of the first dimension, which is read
+            # only once for all variables sharing this dimension
+            dim_sizes = {}
+            for key, dims in self.__dims.items():
+                if dims[0].name not in dim_sizes:
+                    dim_sizes[dims[0].name] = dims[0].size
+                self.dset_stored[key] = dim_sizes[dims[0].name]
 
     def __repr__(self) -> str:
         class_name = type(self).__name__
@@ -127,14 +171,49 @@ class Lv1io:
         return False  # any exception is raised by the with statement.
 
     def close(self) -> None:
-        """Close all resources (currently a placeholder function).
+        """Close product and check if required datasets are filled with data.
         """
         if self.fid is None:
             return
 
+        # check if atleast one dataset is updated
+        if self.time_dim is not None \
+           and self.fid.dimensions[self.time_dim].size > 0:
+            # check of all required dataset their sizes
+            self.check_stored(allow_empty=self.allow_empty)
+            self.__time_coverage()
+
         self.fid.close()
         self.fid = None
 
+    def __time_coverage(self) -> None:
+        """Write global attributes time_coverage_start and time_coverage_end.
+        """
+        dset = self.fid[self.time_var]
+        if 'year' in dset.ncattrs():
+            tstamp = datetime(int(dset.year), int(dset.month), int(dset.day),
+                              tzinfo=timezone.utc)
+        else:
+            tstamp = datetime(self.epoch.year, self.epoch.month,
+                              self.epoch.day, tzinfo=timezone.utc)
+        secnd = dset[[0, -1]].data
+        self.fid.time_coverage_start = (
+            tstamp + timedelta(seconds=float(secnd[0]))).isoformat(
+                timespec='milliseconds')
+        self.fid.time_coverage_end = (
+            tstamp + timedelta(seconds=float(secnd[1]))).isoformat(
+                timespec='milliseconds')
+
+    def check_stored(self, allow_empty=False) -> None:
+        """Check variables with the same first dimension have equal sizes.
+
+        Implemented by the classes of the Level-1 products.
+
+        Parameters
+        ----------
+        allow_empty :  bool, default=False
+        """
+
     # ---------- PUBLIC FUNCTIONS ----------
     @property
     def epoch(self) -> datetime:
@@ -178,6 +257,18 @@ class Lv1io:
 
         return res
 
+    def __attr_parent(self, ds_name=None):
+        """Return the product, group or variable to attach attributes to.
+        """
+        if ds_name is None:
+            return self.fid
+
+        try:
+            return self.fid[ds_name]
+        except (IndexError, KeyError):
+            raise KeyError(
+                f'ds_name {ds_name} not present in product') from None
+
     def set_attr(self, name: str, value, ds_name=None) -> None:
         """Write data to an attribute.
 
@@ -193,27 +284,23 @@ class Lv1io:
            name of group or dataset to which the attribute is attached
            **Use group name without starting '/'**
         """
-        if ds_name is None:
-            if isinstance(value, str):
-                self.fid.setncattr(name, np.string_(value))
-            else:
-                self.fid.setncattr(name, value)
-        else:
-            grp_name = str(PurePosixPath(ds_name).parent)
-            var_name = str(PurePosixPath(ds_name).name)
-            if grp_name != '.':
-                if var_name not in self.fid[grp_name].groups \
-                   and var_name not in self.fid[grp_name].variables:
-                    raise KeyError(f'ds_name {ds_name} not present in product')
-            else:
-                if var_name not in self.fid.groups \
-                   and var_name not in self.fid.variables:
-                    raise KeyError(f'ds_name {ds_name} not present in product')
+        self.__attr_parent(ds_name).setncattr(name, encode_attr(value))
 
-            if isinstance(value, str):
-                self.fid[ds_name].setncattr(name, np.string_(value))
-            else:
-                self.fid[ds_name].setncattr(name, value)
+    def set_attrs(self, mapping: dict, ds_name=None) -> None:
+        """Write data to several attributes.
+
+        Global or attached to a group or variable.
+
+        Parameters
+        ----------
+        mapping : dict
+           values to be written, keyed by the name of the attribute
+        ds_name : string, default=None
+           name of group or dataset to which the attributes are attached
+           **Use group name without starting '/'**
+        """
+        self.__attr_parent(ds_name).setncatts(
+            {key: encode_attr(value) for key, value in mapping.items()})
 
     # ----- VARIABLES --------------------
     def get_dset(self, name: str):
@@ -229,16 +316,40 @@ class Lv1io:
         scalar or array_like
            value of dataset 'name'
         """
-        grp_name = str(PurePosixPath(name).parent)
-        var_name = str(PurePosixPath(name).name)
-        if grp_name != '.':
-            if var_name not in self.fid[grp_name].variables:
-                raise KeyError(f'dataset {name} not present in Level-1 product')
+        if name in self.__vars:
+            return self.__vars[name][:]
+
+        try:
+            var = self.fid[name]
+        except (IndexError, KeyError):
+            raise KeyError(
+                f'dataset {name} not present in Level-1 product') from None
+
+        return var[:]
+
+    def __write_dset(self, name: str, value, ibgn: int) -> None:
+        """Write/append data to a netCDF4 variable.
+        """
+        try:
+            var = self.__vars[name]
+        except KeyError:
+            raise KeyError(
+                f'dataset {name} not present in Level-1 product') from None
+
+        if not isinstance(value, np.ndarray):
+            value = np.asarray(value)
+        dset_stored = self.dset_stored
+        dims = self.__dims[name]
+        if not dims:
+            var[...] = value
+        elif dims[0].isunlimited():
+            if ibgn < 0:
+                ibgn = dset_stored[name]
+            var[ibgn:, ...] = value
         else:
-            if var_name not in self.fid.variables:
-                raise KeyError(f'dataset {name} not present in Level-1 product')
+            var[...] = value
 
-        return self.fid[name][:]
+        dset_stored[name] += 1 if value.ndim == 0 else value.shape[0]
 
     def set_dset(self, name: str, value, ibgn=-1) -> None:
         """Write/append data to a netCDF4 variable.
@@ -253,27 +364,31 @@ class Lv1io:
            Index of the first (unlimited) dimension where to store the new data
            Default is to append the data
         """
-        value = np.asarray(value)
-        grp_name = str(PurePosixPath(name).parent)
-        var_name = str(PurePosixPath(name).name)
-        if grp_name != '.':
-            if var_name not in self.fid[grp_name].variables:
-                raise KeyError(f'dataset {name} not present in Level-1 product')
-        else:
-            if var_name not in self.fid.variables:
-                raise KeyError(f'dataset {name} not present in Level-1 product')
+        self.__write_dset(name, value, ibgn)
 
-        dims = self.fid[name].get_dims()
-        if not dims:
-            self.fid[name][...] = value
-        elif dims[0].isunlimited():
-            if ibgn < 0:
-                ibgn = self.dset_stored[name]
-            self.fid[name][ibgn:, ...] = value
-        else:
-            self.fid[name][...] = value
+    def set_dsets(self, mapping: dict, ibgn=-1) -> None:
+        """Write/append data to several netCDF4 variables.
 
-        self.dset_stored[name] += 1 if value.shape == () else value.shape[0]
+        Parameters
+        ----------
+        mapping : dict
+           Values to be written, keyed by the name of the Level-1 dataset
+        ibgn : int, default=-1
+           Index of the first (unlimited) dimension where to store the new data
+           Default is to append the data
+
+        Notes
+        -----
+        All names are checked before any data is written, thus the product
+        is not partly updated when one of the datasets is not present.
+        """
+        for name in mapping:
+            if name not in self.__vars:
+                raise KeyError(
+                    f'dataset {name} not present in Level-1 product')
+
+        for name, value in mapping.items():
+            self.__write_dset(name, value, ibgn)
 
     # -------------------------
     def fill_global_attrs(self, orbit=-1,
@@ -296,9 +411,9 @@ class Lv1io:
         if bin_size is not None:
             dict_attrs['bin_size_at_nadir'] = bin_size
 
-        for key, value in dict_attrs.items():
-            if value is not None:
-                self.fid.setncattr(key, value)
+        self.fid.setncatts({key: encode_attr(value)
+                            for key, value in dict_attrs.items()
+                            if value is not None})
 
 
 # - class L1Aio -------------------------
@@ -322,6 +437,9 @@ class L1Aio(Lv1io):
 
     """
     processing_level = 'L1A'
+    time_dim = 'number_of_images'
+    time_var = '/image_attributes/image_time'
+    allow_empty = True
     dset_stored = {
         '/science_data/detector_images': 0,
         '/science_data/detector_telemetry': 0,
@@ -341,37 +459,6 @@ class L1Aio(Lv1io):
         '/engineering_data/HK_tlm_time': 0
     }
 
-    def close(self):
-        """Close product and check if required datasets are filled with data.
-        """
-        if self.fid is None:
-            return
-
-        # check if atleast one dataset is updated
-        if self.fid.dimensions['number_of_images'].size == 0:
-            self.fid.close()
-            self.fid = None
-            return
-
-        # check of all required dataset their sizes
-        self.check_stored(allow_empty=True)
-
-        # determine time_coverage_start
-        dset = self.fid['/image_attributes/image_time']
-        tstamp = datetime(int(dset.year), int(dset.month), int(dset.day),
-                          tzinfo=timezone.utc)
-        tstamp += timedelta(seconds=float(dset[0].data))
-        self.fid.time_coverage_start = tstamp.isoformat(timespec='milliseconds')
-
-        # determine time_coverage_end
-        tstamp = datetime(int(dset.year), int(dset.month), int(dset.day),
-                          tzinfo=timezone.utc)
-        tstamp += timedelta(seconds=float(dset[-1].data))
-        self.fid.time_coverage_end = tstamp.isoformat(timespec='milliseconds')
-
-        self.fid.close()
-        self.fid = None
-
     # -------------------------
     def check_stored(self, allow_empty=False):
         """Check variables with the same first dimension have equal sizes.
@@ -385,34 +472,22 @@ class L1Aio(Lv1io):
 
         # check image datasets
         dim_sz = self.get_dim('number_of_images')
-        res = []
-        key_list = [x for x in self.dset_stored
-                    if (x.startswith('/science_data')
-                        or x.startswith('/image_attributes'))]
-        for key in key_list:
-            res.append(self.dset_stored[key])
-        res = np.array(res)
-        if allow_empty:
-            indx = ((res > 0) & (res != dim_sz)).nonzero()[0]
-        else:
-            indx = (res != dim_sz).nonzero()[0]
-        for ii in indx:
-            print(warn_str.format(key_list[ii], res[ii]))
+        for key in self.dset_stored:
+            if not (key.startswith('/science_data')
+                    or key.startswith('/image_attributes')):
+                continue
+            count = self.dset_stored[key]
+            if count != dim_sz and not (allow_empty and count == 0):
+                print(warn_str.format(key, count))
 
         # check house-keeping datasets
         dim_sz = self.get_dim('hk_packets')
-        key_list = [x for x in self.dset_stored
-                    if x.startswith('/engineering_data')]
-        res = []
-        for key in key_list:
-            res.append(self.dset_stored[key])
-        res = np.array(res)
-        if allow_empty:
-            indx = ((res > 0) & (res != dim_sz)).nonzero()[0]
-        else:
-            indx = (res != dim_sz).nonzero()[0]
-        for ii in indx:
-            print(warn_str.format(key_list[ii], res[ii]))
+        for key in self.dset_stored:
+            if not key.startswith('/engineering_data'):
+                continue
+            count = self.dset_stored[key]
+            if count != dim_sz and not (allow_empty and count == 0):
+                print(warn_str.format(key, count))
 
     # ---------- PUBLIC FUNCTIONS ----------
     def fill_science(self, img_data, img_hk, img_id) -> None:
@@ -438,15 +513,15 @@ class L1Aio(Lv1io):
         if len(img_hk) == 0:
             return
 
-        self.set_dset('/science_data/detector_images', img_data)
-        self.set_dset('/science_data/detector_telemetry', img_hk)
-        self.set_dset('/image_attributes/image_ID', img_id)
-
         tm_sc = TMscience(img_hk)
-        self.set_dset('/image_attributes/binning_table', tm_sc.binning_table)
-        self.set_dset('/image_attributes/digital_offset', tm_sc.digital_offset)
-        self.set_dset('/image_attributes/exposure_time', tm_sc.exposure_time)
-        self.set_dset('/image_attributes/nr_coadditions', tm_sc.nr_coadditions)
+        self.set_dsets({
+            '/science_data/detector_images': img_data,
+            '/science_data/detector_telemetry': img_hk,
+            '/image_attributes/image_ID': img_id,
+            '/image_attributes/binning_table': tm_sc.binning_table,
+            '/image_attributes/digital_offset': tm_sc.digital_offset,
+            '/image_attributes/exposure_time': tm_sc.exposure_time,
+            '/image_attributes/nr_coadditions': tm_sc.nr_coadditions})
 
     def fill_nomhk(self, nomhk_data):
         """Write nominal house-keeping telemetry packets (NomHK).
@@ -466,28 +541,20 @@ class L1Aio(Lv1io):
         if len(nomhk_data) == 0:
             return
 
-        self.set_dset('/engineering_data/NomHK_telemetry', nomhk_data)
-
-        if np.all(nomhk_data['TS1_DEM_N_T'] == 0):
-            self.set_dset('/engineering_data/temp_detector',
-                          np.full(nomhk_data.size, 273))
-        else:
-            self.set_dset('/engineering_data/temp_detector',
-                          frac_poly(nomhk_data['TS1_DEM_N_T']))
-
-        if np.all(nomhk_data['TS2_HOUSING_N_T'] == 0):
-            self.set_dset('/engineering_data/temp_housing',
-                          np.full(nomhk_data.size, 293))
-        else:
-            self.set_dset('/engineering_data/temp_housing',
-                          frac_poly(nomhk_data['TS2_HOUSING_N_T']))
-
-        if np.all(nomhk_data['TS3_RADIATOR_N_T'] == 0):
-            self.set_dset('/engineering_data/temp_radiator',
-                          np.full(nomhk_data.size, 294))
-        else:
-            self.set_dset('/engineering_data/temp_radiator',
-                          frac_poly(nomhk_data['TS3_RADIATOR_N_T']))
+        # convert all temperature channels with valid readings in one pass
+        ts_data = np.stack([nomhk_data[key] for key in
+                            ('TS1_DEM_N_T', 'TS2_HOUSING_N_T',
+                             'TS3_RADIATOR_N_T')])
+        valid = ts_data.any(axis=1)
+        temps = [np.broadcast_to(x, nomhk_data.shape) for x in (273, 293, 294)]
+        if valid.any():
+            for ii, res in zip(valid.nonzero()[0], frac_poly(ts_data[valid])):
+                temps[ii] = res
+
+        self.set_dsets({'/engineering_data/NomHK_telemetry': nomhk_data,
+                        '/engineering_data/temp_detector': temps[0],
+                        '/engineering_data/temp_housing': temps[1],
+                        '/engineering_data/temp_radiator': temps[2]})
 
     def fill_demhk(self, demhk_data):
         """Write detector housekeeping telemetry packets (DemHK).
@@ -531,6 +598,8 @@ class L1Bio(Lv1io):
     ToDo: make sure we store the reference date for image_time
     """
     processing_level = 'L1B'
+    time_dim = 'bins_along_track'
+    time_var = '/BIN_ATTRIBUTES/image_time'
     dset_stored = {
         '/BIN_ATTRIBUTES/image_time': 0,
         '/GEOLOCATION_DATA/altitude': 0,
@@ -560,73 +629,35 @@ class L1Bio(Lv1io):
         '/SENSOR_VIEWS_BANDS/view_angles': 0
     }
 
-    def close(self):
-        """Close product and check if required datasets are filled with data.
-        """
-        if self.fid is None:
-            return
-
-        # check if atleast one dataset is updated
-        if self.fid.dimensions['bins_along_track'].size == 0:
-            self.fid.close()
-            self.fid = None
-            return
-
-        # check of all required dataset their sizes
-        self.check_stored()
-
-        # update coverage time
-        secnd = self.fid['/BIN_ATTRIBUTES/image_time'][0].data
-        time0 = (self.epoch
-                 + timedelta(seconds=int(secnd))
-                 + timedelta(microseconds=int(secnd % 1)))
-
-        secnd = self.fid['/BIN_ATTRIBUTES/image_time'][-1].data
-        time1 = (self.epoch
-                 + timedelta(seconds=int(secnd))
-                 + timedelta(microseconds=int(secnd % 1)))
-
-        self.fid.time_coverage_start = time0.isoformat(timespec='milliseconds')
-        self.fid.time_coverage_end = time1.isoformat(timespec='milliseconds')
-
-        self.fid.close()
-        self.fid = None
-
     # -------------------------
-    def check_stored(self):
+    def check_stored(self, allow_empty=False):
         """Check variables with the same first dimension have equal sizes.
+
+        Parameters
+        ----------
+        allow_empty :  bool, default=False
         """
         warn_str = ('SPEX Level-1B format check [WARNING]:'
                     ' size of variable "{:s}" is wrong, only {:d} elements')
 
         # check datasets in group /SENSOR_VIEWS_BANDS
         dim_sz = self.get_dim('number_of_views')
-        res = []
-        key_list = [x for x in self.dset_stored
-                    if x.startswith('/SENSOR_VIEWS_BANDS')]
-        for key in key_list:
-            if key == '/SENSOR_VIEWS_BANDS/viewport_index':
+        for key in self.dset_stored:
+            if not key.startswith('/SENSOR_VIEWS_BANDS') \
+               or key == '/SENSOR_VIEWS_BANDS/viewport_index':
                 continue
-            res.append(self.dset_stored[key])
-        res = np.array(res)
-        indx = (res != dim_sz).nonzero()[0]
-        for ii in indx:
-            print(warn_str.format(key_list[ii], res[ii]))
+            count = self.dset_stored[key]
+            if count != dim_sz and not (allow_empty and count == 0):
+                print(warn_str.format(key, count))
 
         # check datasets in all other groups
         dim_sz = self.get_dim('bins_along_track')
-        res = []
-        key_list = [x for x in self.dset_stored
-                    if not x.startswith('/SENSOR_VIEWS_BANDS')]
-        for key in key_list:
-            res.append(self.dset_stored[key])
-        res = np.array(res)
-        indx = (res != dim_sz).nonzero()[0]
-        for ii in indx:
-            print(warn_str.format(key_list[ii], res[ii]))
-
-        for ii, key in enumerate(self.dset_stored):
-            print(ii, key, self.dset_stored[key])
+        for key in self.dset_stored:
+            if key.startswith('/SENSOR_VIEWS_BANDS'):
+                continue
+            count = self.dset_stored[key]
+            if count != dim_sz and not (allow_empty and count == 0):
+                print(warn_str.format(key, count))
 
     # ---------- PUBLIC FUNCTIONS ----------
 
@@ -650,6 +681,8 @@ class L1Cio(Lv1io):
     ToDo: make sure we store the reference date for image_time
     """
     processing_level = 'L1C'
+    time_dim = 'bins_along_track'
+    time_var = '/BIN_ATTRIBUTES/nadir_view_time'
     dset_stored = {
         '/BIN_ATTRIBUTES/nadir_view_time': 0,
         '/BIN_ATTRIBUTES/view_time_offsets': 0,
@@ -687,72 +720,34 @@ class L1Cio(Lv1io):
         '/SENSOR_VIEWS_BANDS/view_angles': 0
     }
 
-    def close(self):
-        """Close product and check if required datasets are filled with data.
-        """
-        if self.fid is None:
-            return
-
-        # check if atleast one dataset is updated
-        if self.fid.dimensions['bins_along_track'].size == 0:
-            self.fid.close()
-            self.fid = None
-            return
-
-        # check of all required dataset their sizes
-        self.check_stored()
-
-        # update coverage time
-        secnd = self.fid['/BIN_ATTRIBUTES/nadir_view_time'][0].data
-        time0 = (self.epoch
-                 + timedelta(seconds=int(secnd))
-                 + timedelta(microseconds=int(secnd % 1)))
-
-        secnd = self.fid['/BIN_ATTRIBUTES/nadir_view_time'][-1].data
-        time1 = (self.epoch
-                 + timedelta(seconds=int(secnd))
-                 + timedelta(microseconds=int(secnd % 1)))
-
-        self.fid.time_coverage_start = time0.isoformat(timespec='milliseconds')
-        self.fid.time_coverage_end = time1.isoformat(timespec='milliseconds')
-
-        self.fid.close()
-        self.fid = None
-
     # -------------------------
-    def check_stored(self):
+    def check_stored(self, allow_empty=False):
         """Check variables with the same first dimension have equal sizes.
+
+        Parameters
+        ----------
+        allow_empty :  bool, default=False
         """
         warn_str = ('SPEX Level-1C format check [WARNING]:'
                     ' size of variable "{:s}" is wrong, only {:d} elements')
 
         # check datasets in group /SENSOR_VIEWS_BANDS
         dim_sz = self.get_dim('number_of_views')
-        res = []
-        key_list = [x for x in self.dset_stored
-                    if x.startswith('/SENSOR_VIEWS_BANDS')]
-        for key in key_list:
-            if key == '/SENSOR_VIEWS_BANDS/viewport_index':
+        for key in self.dset_stored:
+            if not key.startswith('/SENSOR_VIEWS_BANDS') \
+               or key == '/SENSOR_VIEWS_BANDS/viewport_index':
                 continue
-            res.append(self.dset_stored[key])
-        res = np.array(res)
-        indx = (res != dim_sz).nonzero()[0]
-        for ii in indx:
-            print(warn_str.format(key_list[ii], res[ii]))
+            count = self.dset_stored[key]
+            if count != dim_sz and not (allow_empty and count == 0):
+                print(warn_str.format(key, count))
 
         # check datasets in all other groups
         dim_sz = self.get_dim('bins_along_track')
-        res = []
-        key_list = [x for x in self.dset_stored
-                    if not x.startswith('/SENSOR_VIEWS_BANDS')]
-        for key in key_list:
-            res.append(self.dset_stored[key])
-        res = np.array(res)
-        indx = (res != dim_sz).nonzero()[0]
-        for ii in indx:
-            print(warn_str.format(key_list[ii], res[ii]))
-
-        for ii, key in enumerate(self.dset_stored):
-            print(ii, key, self.dset_stored[key])
+        for key in self.dset_stored:
+            if key.startswith('/SENSOR_VIEWS_BANDS'):
+                continue
+            count = self.dset_stored[key]
+            if count != dim_sz and not (allow_empty and count == 0):
+                print(warn_str.format(key, count))
 
     # ---------- PUBLIC FUNCTIONS ----------
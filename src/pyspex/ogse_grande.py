@@ -10,30 +10,33 @@
 """
 Defines the Grande spectrum for a given number of lamps, used at NASA GSFC.
 """
-__all__ = ['grande_spectrum']
+from __future__ import annotations
+
+__all__ = ['add_ogse_grande', 'grande_spectrum']
+
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import TYPE_CHECKING
 
 import numpy as np
-import xarray as xr
+from netCDF4 import Dataset
+
+if TYPE_CHECKING:
+    import xarray as xr
 
 # - global parameters ------------------------------
-GRANDE_ATTRS = {'source': 'Grande',
-                'date': '2021-03-13',
-                'instrument': 'OL 750',
-                'standard': 'F-736',
-                'technique': 'Cooper',
-                'location': '33/D319',
-                'current': '6.50 A',
-                'distance': 51.42,
-                'diameter': 25.4,
-                'temperature': '23 degree C',
-                'RH': '37%'}
-
-GRANDE_WAVELENGTH = [
-    350, 360, 370, 380, 390, 400, 410, 420, 430, 440, 450, 460, 470, 480, 490,
-    500, 510, 520, 530, 540, 550, 560, 570, 580, 590, 600, 610, 620, 630, 640,
-    650, 660, 670, 680, 690, 700, 710, 720, 730, 740, 750, 760, 770, 780, 790,
-    800, 810, 820, 830, 840, 850, 860, 870, 880, 890, 900, 910, 920, 930, 940,
-    950]
+GRANDE_ATTRS = MappingProxyType({'source': 'Grande',
+                                 'date': '2021-03-13',
+                                 'instrument': 'OL 750',
+                                 'standard': 'F-736',
+                                 'technique': 'Cooper',
+                                 'location': '33/D319',
+                                 'current': '6.50 A',
+                                 'distance': 51.42,
+                                 'diameter': 25.4,
+                                 'temperature': '23 degree C',
+                                 'RH': '37%'})
 
 GRANDE_SPECTRUM = [
     [32.69,  16.88,  8.79,  4.83,  1.08],
@@ -98,42 +101,130 @@ GRANDE_SPECTRUM = [
     [1451.34,  772.54,  425.94,  253.05,  82.50],
     [1461.74,  778.72,  429.51,  255.70,  84.00]]
 
+# convert the Grande constants only once to read-only NumPy arrays
+# - wavelength grid: 350 nm up to 950 nm in steps of 10 nm
+_GRANDE_WV = np.arange(350, 960, 10, dtype='f4')
+_GRANDE_WV.setflags(write=False)
+# - stored as (lamps, wavelength), thus each spectrum is a contiguous row
+_GRANDE_SPEC = np.ascontiguousarray(
+    np.asarray(GRANDE_SPECTRUM, dtype='f4').T)
+_GRANDE_SPEC.setflags(write=False)
+# - release the Python list, keep the public names as read-only arrays
+GRANDE_WAVELENGTH = _GRANDE_WV
+GRANDE_SPECTRUM = _GRANDE_SPEC.T
+
+# radiance spectra [W/(m^2.sr.nm)] for each valid number of lamps
+_LAMP_COL = {9: 0, 5: 1, 3: 2, 2: 3, 1: 4}
+_SCALED = {n_lamps: _GRANDE_SPEC[indx] * np.float32(1e-3)
+           for n_lamps, indx in _LAMP_COL.items()}
+for _spectrum in _SCALED.values():
+    _spectrum.setflags(write=False)
+del _spectrum
+
+# variable attributes, the comment of spectral_radiance is set per call
+_WV_ATTRS = MappingProxyType({'longname': 'wavelength grid',
+                              'units': 'nm',
+                              'comment': 'wavelength annotation'})
+_SIGN_ATTRS = MappingProxyType({'longname': 'Grande radiance spectrum',
+                                'comment': None,
+                                'units': 'W/(m^2.sr.nm)'})
+
+# the spectra are tiny and always fully written: store them contiguous,
+# without any filters and without a _FillValue
+_ENCODING = {key: {'contiguous': True, 'zlib': False, '_FillValue': None}
+             for key in ('wavelength', 'spectral_radiance')}
+
 
 # - local functions ----------------------------
+@lru_cache(maxsize=1)
+def __wavelength_xar() -> xr.DataArray:
+    """
+    Return wavelength grid of the Grande spectra, shared by all lamp counts
+    """
+    import xarray as xr
+
+    return xr.DataArray(_GRANDE_WV,
+                        coords={'wavelength': _GRANDE_WV},
+                        attrs=_WV_ATTRS)
+
+
+@lru_cache(maxsize=8)
 def grande_spectrum(n_lamps: int) -> xr.Dataset:
     """
     Define Grande spectrum for a given number of lamps
+
+    Notes
+    -----
+    The returned Dataset is cached and shared between callers, its data
+    are read-only views of module arrays. Use ``.copy(deep=True)`` to
+    obtain a Dataset which can be modified.
     """
-    lamps_used = (9, 5, 3, 2, 1)
-    try:
-        indx = lamps_used.index(n_lamps)
-    except ValueError as exc:
-        raise ValueError('number of lamps should be 1, 2, 3, 5 or 9') from exc
-
-    wavelength = np.array(GRANDE_WAVELENGTH, dtype='f4')
-    xar_wv = xr.DataArray(wavelength,
-                          coords={'wavelength': wavelength},
-                          attrs={'longname': 'wavelength grid',
-                                 'units': 'nm',
-                                 'comment': 'wavelength annotation'})
-    signal = np.array(GRANDE_SPECTRUM, dtype='f4')
-    xar_sign = xr.DataArray(1e-3 * signal[:, indx],
-                            coords={'wavelength': wavelength},
-                            attrs={'longname': 'Grande radiance spectrum',
-                                   'comment': f'{n_lamps} Lamps',
-                                   'units': 'W/(m^2.sr.nm)'})
+    # xarray is only needed here, add_ogse_grande writes without it
+    import xarray as xr
+
+    if n_lamps not in _SCALED:
+        raise ValueError('number of lamps should be 1, 2, 3, 5 or 9')
+
+    xar_wv = __wavelength_xar()
+    xar_sign = xr.DataArray(_SCALED[n_lamps],
+                            coords={'wavelength': xar_wv['wavelength']},
+                            attrs={**_SIGN_ATTRS,
+                                   'comment': f'{n_lamps} Lamps'})
 
     return xr.Dataset({'wavelength': xar_wv, 'spectral_radiance': xar_sign},
                       attrs=GRANDE_ATTRS)
 
 
+def __write_grande(fid: Dataset, n_lamps: int) -> None:
+    """
+    Write Grande spectrum to an open netCDF4 file, without using xarray
+    """
+    if n_lamps not in _SCALED:
+        raise ValueError('number of lamps should be 1, 2, 3, 5 or 9')
+
+    gid = fid.createGroup('/gse_data/ReferenceSpectrum')
+    gid.setncatts(GRANDE_ATTRS)
+    gid.createDimension('wavelength', _GRANDE_WV.size)
+    for key, values, attrs in (
+            ('wavelength', _GRANDE_WV, _WV_ATTRS),
+            ('spectral_radiance', _SCALED[n_lamps],
+             {**_SIGN_ATTRS, 'comment': f'{n_lamps} Lamps'})):
+        dset = gid.createVariable(key, values.dtype, ('wavelength',),
+                                  contiguous=True, zlib=False,
+                                  fill_value=False)
+        dset.setncatts(attrs)
+        dset[:] = values
+
+
+def add_ogse_grande(l1a_file: str | Path | Dataset, n_lamps: int) -> None:
+    """
+    Add Grande spectrum for a given number of lamps to a L1A product
+
+    Parameters
+    ----------
+    l1a_file :  str | Path | netCDF4.Dataset
+       Either the name of the L1A product, which is opened in mode 'r+' and
+       closed again, or a netCDF4.Dataset of the L1A product opened for
+       writing. An open handle is not closed, thus callers can add several
+       groups to the same product while opening it only once
+    n_lamps :  int
+       number of lamps used, should be 1, 2, 3, 5 or 9
+    """
+    if isinstance(l1a_file, Dataset):
+        __write_grande(l1a_file, n_lamps)
+        return
+
+    with Dataset(l1a_file, 'r+') as fid:
+        __write_grande(fid, n_lamps)
+
+
 def __test(l1a_file: str) -> None:
     """Small function to test this module.
     """
     # Create a netCDF4 file containing a Grande reference spectrum
     xds = grande_spectrum(3)
     xds.to_netcdf(l1a_file, mode='w', format='NETCDF4',
-                  group='/gse_data/ReferenceSpectrum')
+                  group='/gse_data/ReferenceSpectrum', encoding=_ENCODING)
 
 
 # --------------------------------------------------
@@ -13,6 +13,10 @@ Provide access to the software version as obtained from git.
 
 from pyspex import __version__
 
+# - global parameters ------------------------------
+# version without the local version label (everything after '+')
+_SHORT_VERSION = __version__.partition('+')[0]
+
 
 def get(full=False):
     """Returns software version as obtained from git.
@@ -20,4 +24,4 @@ def get(full=False):
     if full:
         return __version__
 
-    return __version__.split('+')[0]
+    return _SHORT_VERSION
@@ -0,0 +1,31 @@
+#
+# This file is part of pyspex
+#
+# https://github.com/rmvanhees/pyspex.git
+#
+# Copyright (c) 2019-2022 SRON - Netherlands Institute for Space Research
+#    All Rights Reserved
+#
+# License:  BSD-3-Clause
+"""
+Tests for the definition of a SPEXone Level-1A product.
+"""
+import datetime
+
+import pytest
+
+from pyspex.lib.l1a_def import init_l1a
+
+
+@pytest.mark.parametrize('compress', [True, False])
+def test_init_l1a_without_samples_per_image(tmp_path, compress):
+    """samples_per_image may be omitted when number_of_images is fixed"""
+    fid = init_l1a(str(tmp_path / 'test_l1a.nc'), datetime.date(2022, 3, 21),
+                   {'number_of_images': 5, 'hk_packets': 3},
+                   compress=compress)
+    try:
+        dset = fid['/science_data/detector_images']
+        assert dset.dimensions == ('number_of_images', 'samples_per_image')
+        assert dset.filters()['zlib'] == compress
+    finally:
+        fid.close()
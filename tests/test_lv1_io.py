@@ -0,0 +1,40 @@
+#
+# This file is part of pyspex
+#
+# https://github.com/rmvanhees/pyspex.git
+#
+# Copyright (c) 2019-2022 SRON - Netherlands Institute for Space Research
+#    All Rights Reserved
+#
+# License:  BSD-3-Clause
+"""
+Tests for the temperature conversion of the SPEXone Level-1 products.
+"""
+import numpy as np
+import pytest
+
+from pyspex.lv1_io import frac_poly
+
+COEFS = (273.15 + 21.19, 6.97828e+7,
+         -3.53275e-25, 7.79625e-31, -4.6505E-32)
+
+
+def frac_poly_ref(xdata):
+    """direct evaluation of the fractional polynomial"""
+    xdata = np.asarray(xdata, dtype=float)
+    return (COEFS[0] + COEFS[1] / xdata + COEFS[2] * xdata ** 4
+            + (COEFS[3] + COEFS[4] * np.log(xdata)) * xdata ** 5)
+
+
+@pytest.mark.parametrize('xdata', [
+    5.4e6,
+    np.uint32(5400000),
+    np.array(5.4e6),
+    np.array([5.1e6, 5.4e6, 5.9e6], dtype='u4'),
+    np.array([[5.1e6, 5.4e6], [5.9e6, 6.2e6]]),
+])
+def test_frac_poly(xdata):
+    """frac_poly accepts scalars and arrays of any shape"""
+    res = frac_poly(xdata)
+    assert np.shape(res) == np.shape(xdata)
+    assert np.allclose(res, frac_poly_ref(xdata), rtol=1e-12)